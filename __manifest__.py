@@ -11,11 +11,20 @@
         'sale',
         'account',
         'base_setup',
+        'crm',
     ],
+    'external_dependencies': {
+        'python': ['numpy'],
+    },
     'data': [
+        'data/ir_sequence_data.xml',
+        'data/utm_source_data.xml',
+        'data/ir_cron_data.xml',
+        'data/ir_actions_server_data.xml',
         'views/templates.xml',
         'views/property_views.xml',
         'views/agent_views.xml',
+        'views/price_report_views.xml',
         'security/ir.model.access.csv',
     ],
     'demo': [
@@ -2,3 +2,4 @@
 from . import main
 from . import property_controller
 from . import search
+from . import sitemap
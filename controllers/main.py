@@ -2,7 +2,10 @@
 from odoo import http, fields, _
 from odoo.http import request, Response
 from odoo.addons.website.controllers.main import Website
+from odoo.addons.ghana_real_estate.models import geo
+from odoo.addons.ghana_real_estate.models.website_cache import CACHE_STATS, LAST_MODIFIED_POLICIES
 import json
+import werkzeug.http
 import werkzeug.urls
 import werkzeug.exceptions
 
@@ -17,65 +20,36 @@ class GhanaRealEstateWebsite(Website):
     ], type='http', auth='public', website=True, sitemap=True)
     def website_home(self, **kwargs):
         """Homepage with featured properties and search"""
-        # Get featured properties
-        featured_properties = request.env['ghana_real_estate.property'].search([
-            ('website_published', '=', True),
-            ('featured', '=', True),
-            ('state', 'in', ['available', 'draft'])
-        ], limit=6, order='sequence, create_date desc')
-        
-        # Get spotlight properties
-        spotlight_properties = request.env['ghana_real_estate.property'].search([
-            ('website_published', '=', True),
-            ('spotlight', '=', True),
-            ('state', 'in', ['available', 'draft'])
-        ], limit=3, order='sequence, create_date desc')
-        
-        # Get property types
-        property_types = request.env['ghana_real_estate.property.type'].search([
-            ('website_published', '=', True),
-            ('active', '=', True)
-        ], limit=6, order='sequence')
-        
-        # Get locations
-        locations = request.env['ghana_real_estate.location'].search([
-            ('active', '=', True)
-        ], limit=10, order='sequence')
-        
-        # Get featured agents
-        featured_agents = request.env['ghana_real_estate.agent'].search([
-            ('website_published', '=', True),
-            ('featured_agent', '=', True),
-            ('active', '=', True)
-        ], limit=4, order='sequence')
+        # Record ids and counters come from the cached homepage snapshot
+        snapshot = request.env['ghana_real_estate.website.cache']._get_homepage_snapshot(
+            request.website.id, request.env.lang)
         
         # Get statistics
         stats = {
-            'properties_for_sale': request.env['ghana_real_estate.property'].search_count([
-                ('website_published', '=', True),
-                ('transaction_type', '=', 'sale'),
-                ('state', 'in', ['available', 'draft'])
-            ]),
-            'properties_for_rent': request.env['ghana_real_estate.property'].search_count([
-                ('website_published', '=', True),
-                ('transaction_type', '=', 'rent'),
-                ('state', 'in', ['available', 'draft'])
-            ]),
+            'properties_for_sale': snapshot['properties_for_sale'],
+            'properties_for_rent': snapshot['properties_for_rent'],
             'happy_clients': 500,  # Can be made dynamic
             'years_experience': 10,
         }
         
+        Property = request.env['ghana_real_estate.property']
         values = {
-            'featured_properties': featured_properties,
-            'spotlight_properties': spotlight_properties,
-            'property_types': property_types,
-            'locations': locations,
-            'featured_agents': featured_agents,
+            'featured_properties': Property.browse(snapshot['featured_property_ids']),
+            'spotlight_properties': Property.browse(snapshot['spotlight_property_ids']),
+            'property_types': request.env['ghana_real_estate.property.type'].browse(
+                snapshot['property_type_ids']),
+            'locations': request.env['ghana_real_estate.location'].browse(snapshot['location_ids']),
+            'featured_agents': request.env['ghana_real_estate.agent'].browse(
+                snapshot['featured_agent_ids']),
             'stats': stats,
             'main_object': None,
         }
         
-        return request.render('ghana_real_estate.premium_homepage', values)
+        return self._render_conditional(
+            'ghana_real_estate.premium_homepage', values, 'home',
+            [values['featured_properties'], values['spotlight_properties'], values['property_types'],
+             values['locations'], values['featured_agents']],
+            extra=(stats['properties_for_sale'], stats['properties_for_rent']))
 
     @http.route('/property/<int:property_id>', type='http', auth='public', website=True, sitemap=True)
     def property_detail(self, property_id, **kwargs):
@@ -85,13 +59,16 @@ class GhanaRealEstateWebsite(Website):
         if not property_obj.exists() or not property_obj.website_published:
             return request.render('website.404')
         
-        # Get similar properties
-        similar_properties = request.env['ghana_real_estate.property'].search([
-            ('website_published', '=', True),
-            ('property_type_id', '=', property_obj.property_type_id.id),
-            ('id', '!=', property_id),
-            ('state', 'in', ['available', 'draft'])
-        ], limit=4, order='create_date desc')
+        # Precomputed neighbours, a plain same-type search until they exist
+        similar_properties = property_obj._get_similar_properties(limit=4)
+        if not similar_properties and property_obj.similarity_dirty:
+            similar_properties = request.env['ghana_real_estate.property'].search([
+                ('website_published', '=', True),
+                ('property_type_id', '=', property_obj.property_type_id.id),
+                ('transaction_type', '=', property_obj.transaction_type),
+                ('id', '!=', property_id),
+                ('state', 'in', ['available', 'draft'])
+            ], limit=4, order='create_date desc')
         
         # Get property images
         images = request.env['ghana_real_estate.property.image'].search([
@@ -105,7 +82,9 @@ class GhanaRealEstateWebsite(Website):
             'main_object': property_obj,
         }
         
-        return request.render('ghana_real_estate.property_detail', values)
+        return self._render_conditional(
+            'ghana_real_estate.property_detail', values, 'property',
+            [property_obj, images, similar_properties, property_obj.agent_id, property_obj.feature_ids])
 
     @http.route('/properties/for-sale', type='http', auth='public', website=True, sitemap=True)
     def properties_for_sale(self, **kwargs):
@@ -146,70 +125,30 @@ class GhanaRealEstateWebsite(Website):
     def _render_properties(self, transaction_type=None, property_type_id=None, location_code=None, **kwargs):
         """Common method to render properties listing"""
         # Build domain
-        domain = [
-            ('website_published', '=', True),
-            ('state', 'in', ['available', 'draft'])
-        ]
-        
+        engine = request.env['ghana_real_estate.property.search']
+        filters = dict(kwargs)
         if transaction_type:
-            domain.append(('transaction_type', '=', transaction_type))
-        
+            filters['transaction_type'] = transaction_type
         if property_type_id:
-            domain.append(('property_type_id', '=', property_type_id))
-        
+            filters['property_type_id'] = property_type_id
         if location_code:
-            domain.append(('location_id.code', '=', location_code))
-        
-        # Search
-        search_term = kwargs.get('search', '')
-        if search_term:
-            domain.append('|')
-            domain.append('|')
-            domain.append('|')
-            domain.append(('name', 'ilike', search_term))
-            domain.append(('city', 'ilike', search_term))
-            domain.append(('address', 'ilike', search_term))
-            domain.append(('description', 'ilike', search_term))
-        
-        # Price range
-        min_price = kwargs.get('min_price')
-        max_price = kwargs.get('max_price')
-        if min_price:
-            domain.append(('price', '>=', float(min_price)))
-        if max_price:
-            domain.append(('price', '<=', float(max_price)))
-        
-        # Bedrooms
-        bedrooms = kwargs.get('bedrooms')
-        if bedrooms and bedrooms != 'any':
-            domain.append(('bedrooms', '>=', int(bedrooms)))
-        
-        # Bathrooms
-        bathrooms = kwargs.get('bathrooms')
-        if bathrooms and bathrooms != 'any':
-            domain.append(('bathrooms', '>=', int(bathrooms)))
+            filters['location_code'] = location_code
+        domain = engine._build_domain(filters)
         
         # Sorting
-        order = kwargs.get('sort', 'create_date desc')
-        allowed_orders = ['create_date desc', 'price asc', 'price desc', 'name asc']
-        if order not in allowed_orders:
-            order = 'create_date desc'
+        order = engine._normalize_order(kwargs.get('sort'))
         
         # Pagination
         page = int(kwargs.get('page', 1))
         per_page = 12
         offset = (page - 1) * per_page
         
-        # Get properties
-        properties = request.env['ghana_real_estate.property'].search(
-            domain, 
-            limit=per_page, 
-            offset=offset, 
-            order=order
-        )
-        
-        # Get total count
-        total_count = request.env['ghana_real_estate.property'].search_count(domain)
+        # Get the page, total count and facet counts
+        result = engine._search_faceted(domain, limit=per_page, offset=offset, order=order,
+                                        search_term=kwargs.get('search'),
+                                        cursor=kwargs.get('cursor'),
+                                        origin=geo.parse_point(kwargs.get('near')),
+                                        filters=filters)
         
         # Get filters for sidebar
         property_types = request.env['ghana_real_estate.property.type'].search([
@@ -223,14 +162,25 @@ class GhanaRealEstateWebsite(Website):
         # Prepare pager
         pager = request.website.pager(
             url='/properties',
-            total=total_count,
+            total=result['total'],
             page=page,
             step=per_page,
             scope=5,
         )
         
+        # Cursor link for "next" navigation, cheap however deep the page is
+        next_url = None
+        if result['next_cursor']:
+            params = {key: value for key, value in kwargs.items() if key not in ('page', 'cursor')}
+            params['cursor'] = result['next_cursor']
+            next_url = '%s?%s' % (request.httprequest.path, werkzeug.urls.url_encode(params))
+        
         values = {
-            'properties': properties,
+            'properties': result['records'],
+            'total_count': result['total'],
+            'facets': result['facets'],
+            'next_url': next_url,
+            'geo_filters': {key: kwargs[key] for key in ('near', 'radius', 'within_bbox') if kwargs.get(key)},
             'property_types': property_types,
             'locations': locations,
             'pager': pager,
@@ -238,7 +188,11 @@ class GhanaRealEstateWebsite(Website):
             'main_object': None,
         }
         
-        return request.render('ghana_real_estate.property_listing', values)
+        return self._render_conditional(
+            'ghana_real_estate.property_listing', values, 'listing',
+            [result['records'], property_types, locations],
+            extra=(result['total'], sorted((key, sorted(counts.items(), key=str))
+                                           for key, counts in result['facets'].items())))
 
     @http.route('/agents', type='http', auth='public', website=True, sitemap=True)
     def agents(self, **kwargs):
@@ -276,7 +230,38 @@ class GhanaRealEstateWebsite(Website):
             'main_object': agent_obj,
         }
         
-        return request.render('ghana_real_estate.agent_detail', values)
+        return self._render_conditional(
+            'ghana_real_estate.agent_detail', values, 'agent', [agent_obj, properties])
+
+    def _render_conditional(self, template, values, policy, recordsets, extra=()):
+        """Render a public page with ETag, Last-Modified and Cache-Control
+        headers, answering conditional requests with a 304 before rendering.
+        """
+        cache = request.env['ghana_real_estate.website.cache']
+        etag, last_modified = cache._get_page_validators(
+            recordsets, extra=(request.website.id, request.httprequest.full_path) + tuple(extra))
+        if policy not in LAST_MODIFIED_POLICIES:
+            last_modified = None
+        headers = [
+            ('ETag', werkzeug.http.quote_etag(etag, weak=True)),
+            ('Cache-Control', cache._get_cache_control(policy)),
+        ]
+        if last_modified:
+            headers.append(('Last-Modified', werkzeug.http.http_date(last_modified)))
+        
+        httprequest = request.httprequest
+        if httprequest.if_none_match:
+            not_modified = httprequest.if_none_match.contains_weak(etag)
+        elif httprequest.if_modified_since and last_modified:
+            # HTTP dates have a one second resolution
+            not_modified = last_modified.replace(microsecond=0) <= \
+                httprequest.if_modified_since.replace(tzinfo=None)
+        else:
+            not_modified = False
+        if not_modified:
+            CACHE_STATS['not_modified'] += 1
+            return request.make_response('', headers=headers, status=304)
+        return request.render(template, values, headers=headers)
 
     @http.route('/contact', type='http', auth='public', website=True, sitemap=True)
     def contact(self, **kwargs):
@@ -294,60 +279,58 @@ class GhanaRealEstateWebsite(Website):
         }
         return request.render('ghana_real_estate.about_page', values)
 
+    @http.route()
+    def robots(self, **kwargs):
+        """robots.txt of the website, pointing crawlers to the property sitemaps"""
+        response = super().robots(**kwargs)
+        response.flatten()
+        sitemap_url = '%ssitemap-real-estate.xml' % request.httprequest.url_root
+        response.set_data(response.get_data() + ('\nSitemap: %s\n' % sitemap_url).encode())
+        return response
+
     # API Endpoints for AJAX calls
+    @http.route('/api/cache/stats', type='json', auth='user', website=True)
+    def api_cache_stats(self, **kwargs):
+        """API endpoint exposing the website cache hit/miss counters"""
+        return request.env['ghana_real_estate.website.cache'].get_cache_stats()
+
     @http.route('/api/properties/search', type='json', auth='public', website=True)
     def api_search_properties(self, **kwargs):
         """API endpoint for property search"""
-        domain = [
-            ('website_published', '=', True),
-            ('state', 'in', ['available', 'draft'])
-        ]
-        
-        # Apply filters from kwargs
-        if kwargs.get('transaction_type'):
-            domain.append(('transaction_type', '=', kwargs['transaction_type']))
-        
-        if kwargs.get('property_type'):
-            domain.append(('property_type_id.code', '=', kwargs['property_type']))
-        
-        if kwargs.get('location'):
-            domain.append('|')
-            domain.append(('city', 'ilike', kwargs['location']))
-            domain.append(('location_id.name', 'ilike', kwargs['location']))
-        
-        if kwargs.get('min_price'):
-            domain.append(('price', '>=', float(kwargs['min_price'])))
-        
-        if kwargs.get('max_price'):
-            domain.append(('price', '<=', float(kwargs['max_price'])))
-        
-        if kwargs.get('bedrooms'):
-            domain.append(('bedrooms', '>=', int(kwargs['bedrooms'])))
+        engine = request.env['ghana_real_estate.property.search']
+        domain = engine._build_domain(kwargs)
         
         # Limit results
         limit = int(kwargs.get('limit', 10))
         offset = int(kwargs.get('offset', 0))
+        origin = geo.parse_point(kwargs.get('near'))
         
-        properties = request.env['ghana_real_estate.property'].search(
-            domain, 
-            limit=limit, 
+        result = engine._search_faceted(
+            domain,
+            limit=limit,
             offset=offset,
-            order='create_date desc'
+            order=kwargs.get('sort'),
+            with_facets=bool(kwargs.get('facets')),
+            search_term=kwargs.get('search'),
+            cursor=kwargs.get('cursor'),
+            origin=origin,
+            filters=kwargs,
         )
+        properties = result['records']
+        
+        cards = properties._get_card_data()
+        if origin:
+            for card, prop in zip(cards, properties):
+                card['distance_km'] = round(geo.haversine_km(
+                    origin[0], origin[1], prop.latitude, prop.longitude), 2) \
+                    if prop.latitude or prop.longitude else None
         
         return {
             'count': len(properties),
-            'properties': [{
-                'id': p.id,
-                'name': p.name,
-                'price': p.price,
-                'display_price': p.display_price,
-                'city': p.city,
-                'bedrooms': p.bedrooms,
-                'bathrooms': p.bathrooms,
-                'image_url': p.image_ids[0].image if p.image_ids else False,
-                'url': f'/property/{p.id}',
-            } for p in properties]
+            'total': result['total'],
+            'facets': result['facets'],
+            'next_cursor': result['next_cursor'],
+            'properties': cards,
         }
 
     @http.route('/api/locations', type='json', auth='public', website=True)
@@ -393,15 +376,5 @@ class GhanaRealEstateWebsite(Website):
         ], limit=limit, order='sequence, create_date desc')
         
         return {
-            'properties': [{
-                'id': p.id,
-                'name': p.name,
-                'price': p.price,
-                'display_price': p.display_price,
-                'city': p.city,
-                'bedrooms': p.bedrooms,
-                'bathrooms': p.bathrooms,
-                'image_url': p.image_ids[0].image if p.image_ids else False,
-                'url': f'/property/{p.id}',
-            } for p in properties]
+            'properties': properties._get_card_data(),
         }
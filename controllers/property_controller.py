@@ -1,5 +1,9 @@
 # -*- coding: utf-8 -*-
 from odoo import http, fields, _
+from odoo.http import request
+
+# Upper bound of the properties returned by one batch API call
+BATCH_MAX_IDS = 50
 
 
 class GhanaRealEstatePropertyController(http.Controller):
@@ -17,15 +21,12 @@ class GhanaRealEstatePropertyController(http.Controller):
                     'error_message': f'Field {field} is required'
                 })
         
-        # Create inquiry
-        inquiry = request.env['crm.lead'].create({
-            'name': f'Property Inquiry: {post.get("property_id")}',
-            'contact_name': post.get('name'),
-            'email_from': post.get('email'),
-            'phone': post.get('phone'),
-            'description': post.get('message', ''),
-            'source_id': request.env.ref('ghana_real_estate.source_property_inquiry').id,
-        })
+        throttled = self._check_submission(post, 'ghana_real_estate.inquiry_thank_you')
+        if throttled:
+            return throttled
+        
+        # Queued, the lead is created by the lead queue worker
+        request.env['ghana_real_estate.lead.queue']._enqueue('inquiry', post)
         
         return request.render('ghana_real_estate.inquiry_thank_you')
 
@@ -41,15 +42,12 @@ class GhanaRealEstatePropertyController(http.Controller):
                     'error_message': f'Field {field} is required'
                 })
         
-        # Create lead with viewing request
-        lead = request.env['crm.lead'].create({
-            'name': f'Viewing Request: {post.get("property_id")}',
-            'contact_name': post.get('name'),
-            'email_from': post.get('email'),
-            'phone': post.get('phone'),
-            'description': f'Preferred Viewing Date: {post.get("preferred_date")}\n\nMessage: {post.get("message", "")}',
-            'source_id': request.env.ref('ghana_real_estate.source_viewing_request').id,
-        })
+        throttled = self._check_submission(post, 'ghana_real_estate.viewing_scheduled')
+        if throttled:
+            return throttled
+        
+        # Queued, the lead is created by the lead queue worker
+        request.env['ghana_real_estate.lead.queue']._enqueue('viewing', post)
         
         return request.render('ghana_real_estate.viewing_scheduled')
 
@@ -65,31 +63,50 @@ class GhanaRealEstatePropertyController(http.Controller):
                     'error_message': f'Field {field} is required'
                 })
         
-        # Create lead
-        lead = request.env['crm.lead'].create({
-            'name': f'Callback Request',
-            'contact_name': post.get('name'),
-            'phone': post.get('phone'),
-            'email_from': post.get('email', ''),
-            'description': f'Preferred callback time: {post.get("preferred_time", "Any time")}',
-            'source_id': request.env.ref('ghana_real_estate.source_callback').id,
-        })
+        throttled = self._check_submission(post, 'ghana_real_estate.callback_confirmed')
+        if throttled:
+            return throttled
+        
+        # Queued, the lead is created by the lead queue worker
+        request.env['ghana_real_estate.lead.queue']._enqueue('callback', post)
         
         return request.render('ghana_real_estate.callback_confirmed')
 
+    def _check_submission(self, post, confirmation_template):
+        """Return the response replacing a throttled or repeated submission,
+        None when the submission may be queued.
+        """
+        limiter = request.env['ghana_real_estate.rate.limit'].sudo()
+        # A resubmission (double click, reload) gets the confirmation again
+        if limiter._is_duplicate_submission(request.httprequest.path, post):
+            return request.render(confirmation_template)
+        keys = [f'ip:{request.httprequest.remote_addr}', f'session:{request.session.sid}']
+        if not limiter._consume(keys):
+            return request.make_response(
+                _('Too many requests, please try again in a minute.'),
+                headers=[('Retry-After', '60'), ('Content-Type', 'text/plain; charset=utf-8')],
+                status=429)
+        return None
+
+    @http.route('/api/leads/queue/metrics', type='json', auth='user', website=True)
+    def lead_queue_metrics(self, **kwargs):
+        """API endpoint exposing the lead queue depth and retries"""
+        return request.env['ghana_real_estate.lead.queue'].get_queue_metrics()
+
     @http.route('/property/compare', type='http', auth='public', website=True)
     def compare_properties(self, **kwargs):
         """Compare selected properties"""
-        property_ids = kwargs.get('ids', '').split(',')
-        property_ids = [int(pid) for pid in property_ids if pid.isdigit()]
+        compare = request.env['ghana_real_estate.property.compare']
+        comparison = compare._get_comparison(compare._normalize_ids(kwargs.get('ids')))
         
-        if len(property_ids) < 2:
+        if len(comparison['property_ids']) < 2:
             return request.redirect('/properties')
         
-        properties = request.env['ghana_real_estate.property'].browse(property_ids)
+        properties = request.env['ghana_real_estate.property'].browse(comparison['property_ids'])
         
         values = {
             'properties': properties,
+            'comparison': comparison,
             'main_object': None,
         }
         
@@ -101,15 +118,78 @@ class GhanaRealEstatePropertyController(http.Controller):
         if not request.session.get('uid'):
             return {'success': False, 'message': 'Please login to save searches'}
         
-        # Create saved search
-        saved_search = request.env['website.property.search'].create({
+        # Filters are normalized and compiled for the alert matcher on create
+        saved_search = request.env['ghana_real_estate.saved.search'].sudo().create({
             'user_id': request.uid,
-            'name': kwargs.get('name', 'My Search'),
-            'filters': json.dumps(kwargs),
+            'name': kwargs.pop('name', None) or 'My Search',
+            'filters': kwargs,
         })
         
         return {'success': True, 'saved_search_id': saved_search.id}
 
+    @http.route('/api/properties/batch', type='http', auth='public', methods=['GET'],
+                website=True, sitemap=False)
+    def get_properties_batch(self, ids='', **kwargs):
+        """API endpoint returning many properties with sparse fieldsets, e.g.
+        ``?ids=12,15,31&fields=name,price,image_url,agent``
+        """
+        property_ids = list(dict.fromkeys(int(pid) for pid in ids.split(',') if pid.strip().isdigit()))
+        if not property_ids:
+            return request.make_json_response({'error': 'ids is required'}, status=400)
+        if len(property_ids) > BATCH_MAX_IDS:
+            return request.make_json_response(
+                {'error': f'At most {BATCH_MAX_IDS} ids per request'}, status=400)
+        field_names = [name.strip() for name in (kwargs.get('fields') or '').split(',') if name.strip()]
+        
+        engine = request.env['ghana_real_estate.property.search']
+        properties = request.env['ghana_real_estate.property'].search(
+            engine._get_base_domain() + [('id', 'in', property_ids)])
+        data = {item['id']: item for item in properties._get_api_data(field_names)}
+        return request.make_json_response({
+            'properties': [data[pid] for pid in property_ids if pid in data],
+            'missing': [pid for pid in property_ids if pid not in data],
+        }, headers=[('Cache-Control', 'public, max-age=60')])
+
+    @http.route('/api/syndication/properties', type='http', auth='public', methods=['GET'],
+                sitemap=False)
+    def get_syndication_feed(self, format='jsonl', since=None, **kwargs):
+        """Listing feed of the syndication partners, e.g.
+        ``?format=xml&since=2024-05-01 10:00:00`` with an
+        ``Authorization: Bearer <token>`` header. Without ``since`` the feed
+        is a full dump, the ``X-Feed-Watermark`` header gives the ``since``
+        of the next delta.
+        """
+        authorization = request.httprequest.headers.get('Authorization', '')
+        token = authorization[7:] if authorization.startswith('Bearer ') else kwargs.get('token')
+        partner = request.env['ghana_real_estate.syndication.partner']._authenticate(token)
+        if not partner:
+            return request.make_json_response({'error': 'Invalid access token'}, status=401)
+        if format not in ('jsonl', 'xml'):
+            return request.make_json_response({'error': 'format must be jsonl or xml'}, status=400)
+        if since:
+            try:
+                since = fields.Datetime.to_datetime(since.replace('T', ' ').rstrip('Z')[:19])
+            except ValueError:
+                return request.make_json_response({'error': 'since must be a UTC datetime'}, status=400)
+        
+        watermark, stream = partner._open_feed(format, since)
+        content_type = 'application/xml; charset=utf-8' if format == 'xml' else 'application/x-ndjson; charset=utf-8'
+        return request.make_response(stream, headers=[
+            ('Content-Type', content_type),
+            ('X-Feed-Watermark', fields.Datetime.to_string(watermark)),
+            ('Cache-Control', 'no-store'),
+        ])
+
+    @http.route('/api/analytics/prices', type='http', auth='user', methods=['GET'], sitemap=False)
+    def get_price_statistics(self, location_id=None, property_type_id=None, transaction_type=None, **kwargs):
+        """API endpoint for the price report, e.g. ``?location_id=3&transaction_type=sale``"""
+        data = request.env['ghana_real_estate.price.report'].get_price_statistics(
+            location_id=int(location_id) if str(location_id or '').isdigit() else None,
+            property_type_id=int(property_type_id) if str(property_type_id or '').isdigit() else None,
+            transaction_type=transaction_type or None,
+        )
+        return request.make_json_response(data, headers=[('Cache-Control', 'private, max-age=300')])
+
     @http.route('/api/property/<int:property_id>', type='json', auth='public', website=True)
     def get_property_details(self, property_id):
         """Get property details via API"""
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+from odoo import http
+from odoo.http import request
+from odoo.addons.ghana_real_estate.models import geo
+
+# Seconds browsers and proxies may reuse a cluster tile
+CLUSTERS_MAX_AGE = 300
+
+
+class GhanaRealEstateSearchController(http.Controller):
+    """Search helper endpoints"""
+
+    @http.route('/api/suggest', type='json', auth='public', website=True)
+    def api_suggest(self, term='', limit=8, **kwargs):
+        """API endpoint for typeahead suggestions"""
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            limit = 8
+        suggestions = request.env['ghana_real_estate.property.search'].sudo()._suggest(term, limit=limit)
+        return {
+            'term': term,
+            'suggestions': suggestions,
+        }
+
+    @http.route('/api/properties/clusters', type='http', auth='public', methods=['GET'],
+                website=True, sitemap=False)
+    def api_property_clusters(self, bbox=None, zoom=None, **kwargs):
+        """API endpoint for map clusters of a viewport, e.g.
+        ``?bbox=5.5,-0.3,5.7,-0.1&zoom=12&transaction_type=sale``
+        """
+        viewport = geo.parse_bbox(bbox)
+        if not viewport:
+            return request.make_json_response({'error': 'bbox=south,west,north,east is required'}, status=400)
+        clusters = request.env['ghana_real_estate.property.search']._get_clusters(kwargs, zoom, viewport)
+        return request.make_json_response({
+            'clusters': clusters,
+        }, headers=[('Cache-Control', f'public, max-age={CLUSTERS_MAX_AGE}')])
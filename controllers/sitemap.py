@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+import base64
+
+from odoo import http
+from odoo.http import request
+
+# Seconds crawlers and proxies may reuse the sitemap files
+SITEMAP_MAX_AGE = 3600
+
+
+class GhanaRealEstateSitemapController(http.Controller):
+    """Sitemaps of the dynamic property, agent, type and location pages"""
+
+    @http.route('/sitemap-real-estate.xml', type='http', auth='public', website=True,
+                multilang=False, sitemap=False)
+    def sitemap_index(self, **kwargs):
+        """Sitemap index of the shards written by the sitemap cron"""
+        Shard = request.env['ghana_real_estate.sitemap.shard'].sudo()
+        return request.make_response(Shard._get_index_xml(Shard.get_base_url()), headers=[
+            ('Content-Type', 'application/xml;charset=utf-8'),
+            ('Cache-Control', f'public, max-age={SITEMAP_MAX_AGE}'),
+        ])
+
+    @http.route('/sitemap-real-estate-<string:kind>-<int:sequence>.xml.gz', type='http', auth='public',
+                website=True, multilang=False, sitemap=False)
+    def sitemap_shard(self, kind, sequence, **kwargs):
+        """One gzipped sitemap shard, served as stored"""
+        shard = request.env['ghana_real_estate.sitemap.shard'].sudo().search([
+            ('kind', '=', kind),
+            ('sequence', '=', sequence),
+            ('attachment_id', '!=', False),
+        ], limit=1)
+        if not shard:
+            return request.not_found()
+        return request.make_response(base64.b64decode(shard.attachment_id.datas), headers=[
+            ('Content-Type', 'application/gzip'),
+            ('Cache-Control', f'public, max-age={SITEMAP_MAX_AGE}'),
+        ])
@@ -1,5 +1,17 @@
 # Ghana Real Estate Models
+from . import website_cache
+from . import job_run
 from . import property
 from . import agent
 from . import property_type
+from . import property_search
+from . import property_compare
+from . import property_import
+from . import property_similarity
+from . import lead_queue
+from . import rate_limit
+from . import saved_search
+from . import sitemap
+from . import syndication
+from . import price_report
 from . import location
@@ -8,9 +8,14 @@ class GhanaRealEstateAgent(models.Model):
     
     _name = 'ghana_real_estate.agent'
     _description = 'Real Estate Agent'
-    _inherit = ['website.seo.metadata', 'website.published.mixin']
+    _inherit = [
+        'website.seo.metadata',
+        'website.published.mixin',
+        'ghana_real_estate.website.cache.mixin',
+    ]
     _order = 'sequence, name'
     _rec_name = 'name'
+    _website_cache_fields = {'website_published', 'featured_agent', 'sequence', 'active'}
 
     # Basic Information
     name = fields.Char(
@@ -176,9 +181,16 @@ class GhanaRealEstateAgent(models.Model):
         compute='_compute_full_contact_info'
     )
     
+    property_ids = fields.One2many(
+        'ghana_real_estate.property',
+        'agent_id',
+        string='Properties'
+    )
+    
     properties_count = fields.Integer(
         string='Active Properties',
-        compute='_compute_properties_count'
+        compute='_compute_properties_count',
+        store=True
     )
     
     # Search Keywords
@@ -232,13 +244,11 @@ class GhanaRealEstateAgent(models.Model):
             """
             record.full_contact_info = info
     
+    @api.depends('property_ids.state', 'property_ids.website_published', 'property_ids.active')
     def _compute_properties_count(self):
+        counts = self.env['ghana_real_estate.property']._read_website_counts('agent_id', self)
         for record in self:
-            record.properties_count = self.env['ghana_real_estate.property'].search_count([
-                ('agent_id', '=', record.id),
-                ('website_published', '=', True),
-                ('state', 'in', ['available', 'draft'])
-            ])
+            record.properties_count = counts.get(record._origin.id, 0)
     
     # Action Methods
     def action_view_properties(self):
@@ -282,6 +292,14 @@ class GhanaRealEstateAgent(models.Model):
             'target': 'new'
         }
     
+    def _get_card_html(self, template='ghana_real_estate.agent_card'):
+        """Website card of the agent, served from the fragment cache. The
+        homepage passes its own, more compact card template.
+        """
+        self.ensure_one()
+        return self.env['ghana_real_estate.website.cache']._render_fragment(
+            template, self, {'agent': self})
+    
     # SQL Constraints
     _sql_constraints = [
         ('unique_license', 'UNIQUE(license_number)', 'License number must be unique!'),
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""Geographic helpers shared by the property search and the map endpoints"""
+import math
+
+# Mean Earth radius in kilometres
+EARTH_RADIUS_KM = 6371.0088
+
+# Radius search bounds in kilometres
+DEFAULT_RADIUS_KM = 5.0
+MAX_RADIUS_KM = 200.0
+
+# Great-circle distance in kilometres between the "latitude"/"longitude"
+# columns of ``alias`` and a point given as (latitude, latitude, longitude)
+# query parameters
+DISTANCE_SQL = """
+    (2 * {radius} * asin(sqrt(
+        power(sin(radians({alias}.latitude - %s) / 2), 2)
+        + cos(radians(%s)) * cos(radians({alias}.latitude))
+        * power(sin(radians({alias}.longitude - %s) / 2), 2)
+    )))
+"""
+
+
+# Box containment of the "longitude"/"latitude" point of ``alias``, matching
+# the GiST index on point(longitude, latitude), with (west, south, east,
+# north) query parameters
+BBOX_SQL = "point({alias}.longitude, {alias}.latitude) <@ box(point(%s, %s), point(%s, %s))"
+
+
+def bbox_sql(alias):
+    """Return the SQL box containment condition for a table alias"""
+    return BBOX_SQL.format(alias=alias)
+
+
+def bbox_params(bbox):
+    south, west, north, east = bbox
+    return [west, south, east, north]
+
+
+def distance_sql(alias):
+    """Return the SQL distance expression for a table alias"""
+    return DISTANCE_SQL.format(radius=EARTH_RADIUS_KM, alias=alias)
+
+
+def distance_params(latitude, longitude):
+    return [latitude, latitude, longitude]
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in kilometres between two points"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = math.radians(lat2 - lat1)
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def _parse_floats(value, count):
+    if isinstance(value, str):
+        value = value.split(',')
+    try:
+        numbers = [float(part) for part in value]
+    except (TypeError, ValueError):
+        return None
+    if len(numbers) != count or not all(math.isfinite(number) for number in numbers):
+        return None
+    return numbers
+
+
+def parse_point(value):
+    """Parse "lat,lng" into (latitude, longitude), None when invalid"""
+    numbers = _parse_floats(value, 2)
+    if not numbers:
+        return None
+    latitude, longitude = numbers
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None
+    return latitude, longitude
+
+
+def parse_bbox(value):
+    """Parse "south,west,north,east" into a tuple, None when invalid"""
+    numbers = _parse_floats(value, 4)
+    if not numbers:
+        return None
+    south, west, north, east = numbers
+    if not (-90 <= south <= north <= 90 and -180 <= west <= east <= 180):
+        return None
+    return south, west, north, east
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """Return the (south, west, north, east) box enclosing a circle"""
+    d_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    # Longitude degrees shrink towards the poles
+    cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+    d_lon = min(math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat)), 180.0)
+    return (
+        max(latitude - d_lat, -90.0),
+        max(longitude - d_lon, -180.0),
+        min(latitude + d_lat, 90.0),
+        min(longitude + d_lon, 180.0),
+    )
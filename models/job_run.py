@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import json
+
+from odoo import models, fields, api
+
+
+class GhanaRealEstateJobRun(models.Model):
+    """Execution log of the scheduled jobs of the module"""
+
+    _name = 'ghana_real_estate.job.run'
+    _description = 'Scheduled Job Run'
+    _order = 'started_at desc, id desc'
+    _rec_name = 'job'
+
+    job = fields.Char(
+        string='Job',
+        required=True,
+        index=True
+    )
+
+    state = fields.Selection([
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('partial', 'Partially Done'),
+        ('failed', 'Failed'),
+    ], string='Status',
+       required=True,
+       default='running'
+    )
+
+    started_at = fields.Datetime(
+        string='Started At',
+        required=True,
+        default=fields.Datetime.now
+    )
+
+    finished_at = fields.Datetime(
+        string='Finished At'
+    )
+
+    duration = fields.Float(
+        string='Duration (s)',
+        digits=(10, 2)
+    )
+
+    records_processed = fields.Integer(
+        string='Records Processed'
+    )
+
+    statistics = fields.Text(
+        string='Statistics',
+        help='JSON encoded statistics of the run'
+    )
+
+    message = fields.Text(
+        string='Message'
+    )
+
+    @api.model
+    def _start(self, job):
+        """Log the start of a job run"""
+        return self.sudo().create({'job': job})
+
+    def _finish(self, state='done', records_processed=0, statistics=None, message=None):
+        """Log the outcome of a job run"""
+        self.ensure_one()
+        finished_at = fields.Datetime.now()
+        self.write({
+            'state': state,
+            'finished_at': finished_at,
+            'duration': (finished_at - self.started_at).total_seconds(),
+            'records_processed': records_processed,
+            'statistics': json.dumps(statistics or {}, indent=2, sort_keys=True, default=str),
+            'message': message,
+        })
+
+    @api.model
+    def _get_last_run(self, job, states=('done',)):
+        return self.search([('job', '=', job), ('state', 'in', list(states))], limit=1)
@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+import logging
+import re
+import time
+from datetime import timedelta
+
+from odoo import models, fields, api, _
+from odoo.tools import plaintext2html
+
+_logger = logging.getLogger(__name__)
+
+# Worker bounds
+LEAD_QUEUE_BATCH_SIZE = 200
+LEAD_QUEUE_MAX_ATTEMPTS = 5
+LEAD_QUEUE_TIME_BUDGET = 240
+
+# Submissions of the same contact for the same property within this window
+# are attached to the first lead instead of creating a new one
+LEAD_DEDUPE_WINDOW = timedelta(days=7)
+
+# Lead title and UTM source of each submission type
+LEAD_TYPES = {
+    'inquiry': ('Property Inquiry', 'ghana_real_estate.source_property_inquiry'),
+    'viewing': ('Viewing Request', 'ghana_real_estate.source_viewing_request'),
+    'callback': ('Callback Request', 'ghana_real_estate.source_callback'),
+}
+
+
+class GhanaRealEstateLeadQueue(models.Model):
+    """Website form submissions waiting to become CRM leads"""
+
+    _name = 'ghana_real_estate.lead.queue'
+    _description = 'Queued Website Lead'
+    _order = 'id'
+
+    lead_type = fields.Selection([
+        ('inquiry', 'Inquiry'),
+        ('viewing', 'Viewing Request'),
+        ('callback', 'Callback Request'),
+    ], string='Type',
+       required=True
+    )
+
+    property_id = fields.Many2one(
+        'ghana_real_estate.property',
+        string='Property',
+        ondelete='set null'
+    )
+
+    contact_name = fields.Char(
+        string='Contact Name'
+    )
+
+    email = fields.Char(
+        string='Email'
+    )
+
+    phone = fields.Char(
+        string='Phone'
+    )
+
+    message = fields.Text(
+        string='Message'
+    )
+
+    preferred_date = fields.Char(
+        string='Preferred Date'
+    )
+
+    preferred_time = fields.Char(
+        string='Preferred Time'
+    )
+
+    dedupe_key = fields.Char(
+        string='Dedupe Key',
+        index=True
+    )
+
+    state = fields.Selection([
+        ('queued', 'Queued'),
+        ('done', 'Done'),
+        ('duplicate', 'Duplicate'),
+        ('failed', 'Failed'),
+    ], string='Status',
+       required=True,
+       default='queued',
+       index=True
+    )
+
+    attempts = fields.Integer(
+        string='Attempts'
+    )
+
+    last_error = fields.Text(
+        string='Last Error'
+    )
+
+    lead_id = fields.Many2one(
+        'crm.lead',
+        string='Lead',
+        ondelete='set null'
+    )
+
+    processed_at = fields.Datetime(
+        string='Processed At'
+    )
+
+    @api.model
+    def _enqueue(self, lead_type, post):
+        """Store a form submission, the only write made during the request"""
+        property_id = post.get('property_id')
+        property_id = int(property_id) if str(property_id or '').isdigit() else False
+        vals = {
+            'lead_type': lead_type,
+            'property_id': property_id,
+            'contact_name': post.get('name'),
+            'email': (post.get('email') or '').strip(),
+            'phone': (post.get('phone') or '').strip(),
+            'message': post.get('message', ''),
+            'preferred_date': post.get('preferred_date'),
+            'preferred_time': post.get('preferred_time'),
+        }
+        vals['dedupe_key'] = self._get_dedupe_key(vals)
+        return self.sudo().create(vals)
+
+    @api.model
+    def _get_dedupe_key(self, vals):
+        """Type, property and contact (email, else phone digits) of a submission"""
+        contact = (vals.get('email') or '').lower() or re.sub(r'\D', '', vals.get('phone') or '')
+        return f"{vals.get('lead_type')}:{vals.get('property_id') or 0}:{contact}"
+
+    # Cron Jobs
+    @api.model
+    def _cron_process_queue(self):
+        """Drain the queue into crm.lead, one committed batch at a time"""
+        run = self.env['ghana_real_estate.job.run']._start('lead_queue')
+        self.env.cr.commit()
+        stats = {'created': 0, 'duplicates': 0, 'retried': 0, 'failed': 0, 'batches': 0}
+        started = time.time()
+        last_id = 0
+        while time.time() - started < LEAD_QUEUE_TIME_BUDGET:
+            # SKIP LOCKED lets several workers drain the queue concurrently,
+            # submissions left queued for a retry wait for the next run
+            self.env.cr.execute("""
+                SELECT id FROM ghana_real_estate_lead_queue
+                 WHERE state = 'queued' AND id > %s
+              ORDER BY id
+                 LIMIT %s
+                   FOR UPDATE SKIP LOCKED
+            """, [last_id, LEAD_QUEUE_BATCH_SIZE])
+            batch = self.browse([row[0] for row in self.env.cr.fetchall()])
+            if not batch:
+                break
+            last_id = batch.ids[-1]
+            batch._process_batch(stats)
+            stats['batches'] += 1
+            self.env.cr.commit()
+            self.env.invalidate_all()
+        stats.update(self.get_queue_metrics())
+        run._finish('done', stats['created'] + stats['duplicates'], stats)
+        self.env.cr.commit()
+
+    def _process_batch(self, stats):
+        now = fields.Datetime.now()
+        # Leads already created for these contacts and properties
+        known = {}
+        for item in self.search([
+            ('dedupe_key', 'in', list(set(self.mapped('dedupe_key')))),
+            ('state', '=', 'done'),
+            ('lead_id', '!=', False),
+            ('processed_at', '>=', now - LEAD_DEDUPE_WINDOW),
+        ], order='id'):
+            known.setdefault(item.dedupe_key, item.lead_id)
+
+        to_create = self.browse()
+        duplicates = self.browse()
+        seen = set(known)
+        for item in self:
+            if item.dedupe_key in seen:
+                duplicates |= item
+            else:
+                seen.add(item.dedupe_key)
+                to_create |= item
+
+        Lead = self.env['crm.lead'].sudo()
+        try:
+            with self.env.cr.savepoint():
+                leads = Lead.create([item._prepare_lead_vals() for item in to_create])
+            created = list(zip(to_create, leads))
+        except Exception:
+            # Isolate the faulty submissions
+            created = []
+            for item in to_create:
+                try:
+                    with self.env.cr.savepoint():
+                        created.append((item, Lead.create(item._prepare_lead_vals())))
+                except Exception as e:
+                    attempts = item.attempts + 1
+                    failed = attempts >= LEAD_QUEUE_MAX_ATTEMPTS
+                    item.write({
+                        'attempts': attempts,
+                        'last_error': str(e),
+                        'state': 'failed' if failed else 'queued',
+                    })
+                    stats['failed' if failed else 'retried'] += 1
+                    _logger.warning('Queued lead %s failed (attempt %s): %s', item.id, attempts, e)
+
+        for item, lead in created:
+            item.write({'state': 'done', 'lead_id': lead.id, 'processed_at': now,
+                        'attempts': item.attempts + 1})
+            known[item.dedupe_key] = lead
+            stats['created'] += 1
+        # Duplicates of a submission that failed stay queued behind it, the
+        # others add their message and dates to the lead they repeat
+        for item in duplicates:
+            lead = known.get(item.dedupe_key)
+            if lead:
+                lead.sudo().message_post(body=plaintext2html(item._get_followup_message()))
+                item.write({'state': 'duplicate', 'lead_id': lead.id, 'processed_at': now})
+                stats['duplicates'] += 1
+
+    def _prepare_lead_vals(self):
+        self.ensure_one()
+        title, source_xmlid = LEAD_TYPES[self.lead_type]
+        if self.property_id:
+            title = f'{title}: {self.property_id.property_code or self.property_id.id}'
+        if self.lead_type == 'viewing':
+            description = f'Preferred Viewing Date: {self.preferred_date}\n\nMessage: {self.message or ""}'
+        elif self.lead_type == 'callback':
+            description = f'Preferred callback time: {self.preferred_time or "Any time"}'
+        else:
+            description = self.message or ''
+        source = self.env.ref(source_xmlid, raise_if_not_found=False)
+        return {
+            'name': title,
+            'contact_name': self.contact_name,
+            'email_from': self.email,
+            'phone': self.phone,
+            'description': description,
+            'source_id': source.id if source else False,
+        }
+
+    def _get_followup_message(self):
+        """Text of a repeated submission, logged on the lead it repeats"""
+        self.ensure_one()
+        title = LEAD_TYPES[self.lead_type][0]
+        lines = [_('New %s from the website', title)]
+        if self.preferred_date:
+            lines.append(_('Preferred Viewing Date: %s', self.preferred_date))
+        if self.preferred_time:
+            lines.append(_('Preferred callback time: %s', self.preferred_time))
+        if self.message:
+            lines.append(_('Message: %s', self.message))
+        return '\n'.join(lines)
+
+    @api.model
+    def get_queue_metrics(self):
+        """Queue depth, retries and age of the oldest pending submission"""
+        self.env.cr.execute("""
+            SELECT COUNT(*) FILTER (WHERE state = 'queued'),
+                   COUNT(*) FILTER (WHERE state = 'queued' AND attempts > 0),
+                   COUNT(*) FILTER (WHERE state = 'failed'),
+                   EXTRACT(EPOCH FROM (NOW() AT TIME ZONE 'UTC' - MIN(create_date) FILTER (WHERE state = 'queued')))
+              FROM ghana_real_estate_lead_queue
+        """)
+        depth, retrying, failed, oldest_age = self.env.cr.fetchone()
+        return {
+            'queue_depth': depth,
+            'retrying': retrying,
+            'failed_total': failed,
+            'oldest_queued_seconds': round(oldest_age or 0.0, 1),
+        }
+
+    # Action Methods
+    def action_retry(self):
+        """Queue failed submissions again"""
+        failed = self.filtered(lambda item: item.state == 'failed')
+        failed.write({
+            'state': 'queued',
+            'attempts': 0,
+            'last_error': False,
+        })
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Lead Queue'),
+                'message': _('%s submissions queued again.', len(failed)),
+                'type': 'success',
+                'sticky': False,
+            },
+        }
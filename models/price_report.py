@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+PRICE_REPORT_JOB = 'price_report'
+
+# States counted in the days on market: still listed, and closed deals
+DAYS_ON_MARKET_OPEN_STATES = ('available', 'pending')
+DAYS_ON_MARKET_CLOSED_STATES = ('sold', 'rented')
+
+# Figures exposed by the JSON endpoint, in order
+PRICE_REPORT_MEASURES = [
+    'property_count', 'avg_price', 'p25_price', 'median_price', 'p75_price',
+    'median_price_per_sqft', 'avg_days_on_market', 'median_days_on_market',
+]
+
+
+class GhanaRealEstatePriceReport(models.Model):
+    """Price statistics per location, property type and transaction type.
+
+    Backed by a materialized view so that dashboards never aggregate the
+    property table themselves, see _cron_refresh_report().
+    """
+
+    _name = 'ghana_real_estate.price.report'
+    _description = 'Property Price Analysis'
+    _auto = False
+    _order = 'location_id, property_type_id, transaction_type'
+
+    location_id = fields.Many2one(
+        'ghana_real_estate.location',
+        string='Location',
+        readonly=True
+    )
+
+    property_type_id = fields.Many2one(
+        'ghana_real_estate.property.type',
+        string='Property Type',
+        readonly=True
+    )
+
+    transaction_type = fields.Selection([
+        ('sale', 'For Sale'),
+        ('rent', 'For Rent'),
+        ('lease', 'For Lease'),
+    ], string='Transaction Type',
+       readonly=True
+    )
+
+    property_count = fields.Integer(
+        string='Properties',
+        readonly=True
+    )
+
+    # Percentiles of different groups cannot be combined, the pivot shows
+    # their mean when rows are grouped further
+    avg_price = fields.Float(
+        string='Average Price',
+        readonly=True,
+        group_operator='avg'
+    )
+
+    p25_price = fields.Float(
+        string='Price (25th Percentile)',
+        readonly=True,
+        group_operator='avg'
+    )
+
+    median_price = fields.Float(
+        string='Median Price',
+        readonly=True,
+        group_operator='avg'
+    )
+
+    p75_price = fields.Float(
+        string='Price (75th Percentile)',
+        readonly=True,
+        group_operator='avg'
+    )
+
+    median_price_per_sqft = fields.Float(
+        string='Median Price per Sq Ft',
+        readonly=True,
+        group_operator='avg',
+        digits=(10, 2)
+    )
+
+    avg_days_on_market = fields.Float(
+        string='Average Days on Market',
+        readonly=True,
+        group_operator='avg',
+        digits=(10, 1)
+    )
+
+    median_days_on_market = fields.Float(
+        string='Median Days on Market',
+        readonly=True,
+        group_operator='avg',
+        digits=(10, 1)
+    )
+
+    def init(self):
+        # Days on market are only counted for listings on the market, up to
+        # the refresh, and for closed deals, up to the day they went off the
+        # market. Drafts, off-plan and expired listings never had or no
+        # longer have a market time. Only the view definition runs here, the
+        # first refresh of the cron fills it. Ids are a hash of the group
+        # key, stable across refreshes and within the integers of the client.
+        self.env.cr.execute(f"""
+            DROP MATERIALIZED VIEW IF EXISTS {self._table};
+            CREATE MATERIALIZED VIEW {self._table} AS (
+                SELECT ('x' || substr(md5(COALESCE(location_id::text, '') || ':'
+                                          || COALESCE(property_type_id::text, '') || ':'
+                                          || COALESCE(transaction_type, '')), 1, 13))::bit(52)::bigint AS id,
+                       location_id,
+                       property_type_id,
+                       transaction_type,
+                       COUNT(*) AS property_count,
+                       AVG(price) AS avg_price,
+                       percentile_cont(0.25) WITHIN GROUP (ORDER BY price) AS p25_price,
+                       percentile_cont(0.5) WITHIN GROUP (ORDER BY price) AS median_price,
+                       percentile_cont(0.75) WITHIN GROUP (ORDER BY price) AS p75_price,
+                       percentile_cont(0.5) WITHIN GROUP (ORDER BY price_per_sqft)
+                           FILTER (WHERE price_per_sqft > 0) AS median_price_per_sqft,
+                       AVG(days_on_market) AS avg_days_on_market,
+                       percentile_cont(0.5) WITHIN GROUP (ORDER BY days_on_market) AS median_days_on_market
+                  FROM (SELECT location_id, property_type_id, transaction_type, price, price_per_sqft,
+                               CASE
+                                   WHEN state IN %(on_market)s
+                                   THEN GREATEST(CURRENT_DATE - create_date::date, 0)
+                                   WHEN state IN %(closed)s
+                                   THEN GREATEST(COALESCE(off_market_date, sold_date, write_date::date)
+                                                 - create_date::date, 0)
+                               END AS days_on_market
+                          FROM ghana_real_estate_property
+                         WHERE active AND price > 0) AS listing
+              GROUP BY location_id, property_type_id, transaction_type
+            ) WITH NO DATA;
+            CREATE UNIQUE INDEX {self._table}_id_idx ON {self._table} (id);
+        """, {'on_market': DAYS_ON_MARKET_OPEN_STATES, 'closed': DAYS_ON_MARKET_CLOSED_STATES})
+        # Fill it right away on upgrades, a new cron runs at install anyway
+        cron = self.env.ref('ghana_real_estate.ir_cron_refresh_price_report', raise_if_not_found=False)
+        if cron:
+            cron._trigger()
+
+    @api.model
+    def _get_data_signature(self):
+        """Cheap fingerprint of the property data and of the current date"""
+        self.env.cr.execute("""
+            SELECT COUNT(*), MAX(write_date), CURRENT_DATE
+              FROM ghana_real_estate_property
+        """)
+        return json.dumps(self.env.cr.fetchone(), default=str)
+
+    # Cron Jobs
+    @api.model
+    def _cron_refresh_report(self):
+        """Refresh the materialized view when properties changed since the
+        last refresh. The concurrent refresh keeps the report readable while
+        it is recomputed; a view created by an upgrade holds no data yet and
+        is filled by a plain refresh.
+        """
+        JobRun = self.env['ghana_real_estate.job.run']
+        self.env.cr.execute("SELECT ispopulated FROM pg_matviews WHERE matviewname = %s", [self._table])
+        populated = self.env.cr.fetchone()[0]
+        signature = self._get_data_signature()
+        last_run = JobRun._get_last_run(PRICE_REPORT_JOB)
+        if populated and last_run and json.loads(last_run.statistics or '{}').get('signature') == signature:
+            return
+        run = JobRun._start(PRICE_REPORT_JOB)
+        self.env.cr.commit()
+        concurrently = 'CONCURRENTLY' if populated else ''
+        self.env.cr.execute(f'REFRESH MATERIALIZED VIEW {concurrently} {self._table}')
+        self.env.cr.execute(f'SELECT COUNT(*) FROM {self._table}')
+        rows = self.env.cr.fetchone()[0]
+        self.invalidate_model()
+        run._finish('done', rows, {'signature': signature, 'rows': rows})
+        self.env.cr.commit()
+        _logger.info('Refreshed the price report, %s rows', rows)
+
+    @api.model
+    def get_price_statistics(self, location_id=None, property_type_id=None, transaction_type=None):
+        """Report rows matching the given dimensions, for the JSON endpoint"""
+        domain = []
+        if location_id:
+            domain.append(('location_id', '=', location_id))
+        if property_type_id:
+            domain.append(('property_type_id', '=', property_type_id))
+        if transaction_type:
+            domain.append(('transaction_type', '=', transaction_type))
+        rows = []
+        for record in self.search(domain):
+            row = {
+                'location': record.location_id and {'id': record.location_id.id, 'name': record.location_id.name} or False,
+                'property_type': record.property_type_id and {
+                    'id': record.property_type_id.id, 'name': record.property_type_id.name} or False,
+                'transaction_type': record.transaction_type,
+            }
+            row.update({measure: record[measure] for measure in PRICE_REPORT_MEASURES})
+            rows.append(row)
+        last_run = self.env['ghana_real_estate.job.run'].sudo()._get_last_run(PRICE_REPORT_JOB)
+        return {
+            'refreshed_at': last_run.finished_at or False,
+            'rows': rows,
+        }
@@ -1,17 +1,104 @@
 # -*- coding: utf-8 -*-
-from odoo import models, fields, api, _
-from odoo.exceptions import ValidationError
-from datetime import datetime
+from odoo import models, fields, api, tools, _
+from odoo.exceptions import UserError, ValidationError
+from odoo.tools import split_every
+from odoo.tools.image import ImageProcess
+from odoo.tools.sql import create_index
+from datetime import datetime, timedelta
+import base64
+import hashlib
+import io
+import logging
 import re
+import time
+
+from .website_cache import WEBSITE_STATES
+
+_logger = logging.getLogger(__name__)
+
+# Text search configuration of the search_vector column
+FTS_CONFIG = 'english'
+
+
+# Property fields the materialized city counters depend on
+CITY_COUNTER_FIELDS = {'city', 'location_id', 'state', 'website_published', 'active'}
+
+# Property fields the precomputed similar properties depend on
+SIMILARITY_FIELDS = {
+    'property_type_id', 'location_id', 'transaction_type', 'price', 'bedrooms',
+    'latitude', 'longitude', 'state', 'website_published', 'active',
+}
+
+# Property fields the search results, counts and map clusters depend on
+LISTING_FIELDS = {
+    'name', 'property_code', 'city', 'property_type_id', 'location_id', 'transaction_type',
+    'price', 'bedrooms', 'bathrooms', 'latitude', 'longitude', 'state', 'website_published',
+    'active',
+}
+
+# States of properties no longer on the market, see off_market_date
+OFF_MARKET_STATES = ('sold', 'rented', 'expired')
+
+# Lifecycle transitions as {name: (allowed source states or None for any, values)}
+LIFECYCLE_TRANSITIONS = {
+    'publish': (('draft', 'available', 'pending', 'off_plan'),
+                {'website_published': True, 'state': 'available'}),
+    'unpublish': (None, {'website_published': False}),
+    'mark_as_sold': (('draft', 'available', 'pending', 'off_plan'), {'state': 'sold'}),
+    'mark_as_rented': (('draft', 'available', 'pending'), {'state': 'rented'}),
+    'mark_as_pending': (('draft', 'available', 'off_plan'), {'state': 'pending'}),
+    'reset_to_available': (('draft', 'pending', 'sold', 'rented', 'off_plan'), {'state': 'available'}),
+    'expire': (('draft', 'pending'), {'state': 'expired', 'website_published': False}),
+}
+LIFECYCLE_CHUNK_SIZE = 1000
+
+# Plain fields the batch API can return as they are, see _get_api_data()
+API_SCALAR_FIELDS = [
+    'name', 'property_code', 'description', 'price', 'display_price', 'city', 'address',
+    'bedrooms', 'bathrooms', 'land_size', 'building_size', 'state', 'transaction_type',
+    'furnished', 'latitude', 'longitude',
+]
+API_RELATION_FIELDS = ['url', 'image_url', 'images', 'features', 'property_type', 'agent', 'location']
+API_DEFAULT_FIELDS = ['name', 'display_price', 'price', 'city', 'bedrooms', 'bathrooms', 'image_url', 'url']
+
+# Defaults of the availability job, overridable with ir.config_parameter
+AVAILABILITY_JOB = 'property_availability'
+AVAILABILITY_STALE_DAYS = 90
+AVAILABILITY_BATCH_SIZE = 1000
+AVAILABILITY_TIME_BUDGET = 600
+
+# Responsive image derivatives as (size, bounding box in pixels)
+IMAGE_VARIANT_SIZES = [
+    ('thumbnail', 160),
+    ('card', 480),
+    ('detail', 1024),
+    ('fullscreen', 1920),
+]
+IMAGE_VARIANT_FORMATS = ['webp', 'jpeg']
+IMAGE_VARIANT_QUALITY = 80
+
+
+def image_url(model, res_id, field, write_date):
+    """Return a /web/image URL with a checksum that changes with the record"""
+    checksum = hashlib.sha1(str(write_date).encode()).hexdigest()[:8]
+    return f'/web/image/{model}/{res_id}/{field}?unique={checksum}'
 
 class GhanaRealEstateProperty(models.Model):
     """Premium Property Model for Ghana Real Estate Website"""
     
     _name = 'ghana_real_estate.property'
     _description = 'Ghana Real Estate Property'
-    _inherit = ['website.seo.metadata', 'website.published.mixin']
+    _inherit = [
+        'website.seo.metadata',
+        'website.published.mixin',
+        'ghana_real_estate.website.cache.mixin',
+    ]
     _order = 'create_date desc'
     _rec_name = 'name'
+    _website_cache_fields = {
+        'featured', 'spotlight', 'website_published', 'state',
+        'sequence', 'transaction_type', 'active',
+    }
 
     # Basic Information
     name = fields.Char(
@@ -51,6 +138,7 @@ class GhanaRealEstateProperty(models.Model):
         ('sold', 'Sold'),
         ('rented', 'Rented'),
         ('off_plan', 'Off Plan'),
+        ('expired', 'Expired'),
     ], string='Status',
        required=True,
        default='draft',
@@ -233,10 +321,25 @@ class GhanaRealEstateProperty(models.Model):
         copy=False
     )
     
+    off_market_date = fields.Date(
+        string='Off Market Since',
+        readonly=True,
+        copy=False,
+        help='Date the property was sold, rented or expired'
+    )
+    
     # Computed Fields
+    main_image_id = fields.Many2one(
+        'ghana_real_estate.property.image',
+        string='Main Image Record',
+        compute='_compute_main_image_id',
+        store=True,
+        index=True
+    )
+    
     main_image = fields.Binary(
         string='Main Image',
-        related='image_ids.image',
+        related='main_image_id.image',
         readonly=True
     )
     
@@ -263,6 +366,27 @@ class GhanaRealEstateProperty(models.Model):
         help='Keywords for search optimization'
     )
     
+    # Plain text indexed by the search_vector column, see init()
+    search_document = fields.Text(
+        string='Search Document',
+        compute='_compute_search_document',
+        store=True
+    )
+    
+    full_text = fields.Char(
+        string='Full Text',
+        compute='_compute_full_text',
+        search='_search_full_text'
+    )
+    
+    # Set when the precomputed similar properties need a refresh
+    similarity_dirty = fields.Boolean(
+        string='Similar Properties Outdated',
+        default=True,
+        copy=False,
+        index=True
+    )
+    
     # Year Built
     year_built = fields.Integer(
         string='Year Built'
@@ -312,6 +436,13 @@ class GhanaRealEstateProperty(models.Model):
             else:
                 record.price_per_sqft = 0.0
     
+    @api.depends('image_ids.is_main', 'image_ids.sequence')
+    def _compute_main_image_id(self):
+        for record in self:
+            # image_ids is ordered by sequence, the flagged image wins
+            images = record.image_ids
+            record.main_image_id = images.filtered('is_main')[:1] or images[:1]
+    
     def _compute_image_count(self):
         for record in self:
             record.image_count = len(record.image_ids)
@@ -324,6 +455,30 @@ class GhanaRealEstateProperty(models.Model):
     def _search_is_available(self, operator, value):
         return [('state', 'in', ['available', 'draft'])]
     
+    @api.depends('address', 'description')
+    def _compute_search_document(self):
+        for record in self:
+            description = tools.html2plaintext(record.description or '')
+            record.search_document = ' '.join(filter(None, [record.address, description]))
+    
+    def _compute_full_text(self):
+        self.full_text = False
+    
+    def _search_full_text(self, operator, value):
+        tsquery = self._get_fts_query(value)
+        if not tsquery:
+            return []
+        return [('id', 'inselect', (
+            f'SELECT id FROM "{self._table}" WHERE search_vector @@ to_tsquery(%s, %s)',
+            (FTS_CONFIG, tsquery),
+        ))]
+    
+    @api.model
+    def _get_fts_query(self, term):
+        """Turn user input into a prefix tsquery, e.g. 'east leg' -> 'east:* & leg:*'"""
+        words = re.findall(r'\w+', term or '')
+        return ' & '.join(f'{word}:*' for word in words)
+    
     @api.depends('price', 'currency_id')
     def _compute_display_price(self):
         for record in self:
@@ -339,6 +494,20 @@ class GhanaRealEstateProperty(models.Model):
         sequence = self.env['ir.sequence'].next_by_code('ghana_real_estate.property')
         return f"GRE-{sequence}"
     
+    @api.model
+    def _reserve_property_codes(self, count):
+        """Reserve a block of property codes in a single query"""
+        sequence = self.env['ir.sequence'].sudo().search([
+            ('code', '=', 'ghana_real_estate.property'),
+            ('company_id', 'in', [self.env.company.id, False]),
+        ], order='company_id', limit=1)
+        if not sequence or sequence.implementation != 'standard' or sequence.use_date_range:
+            return [self._generate_property_code() for _index in range(count)]
+        self.env.cr.execute(
+            "SELECT nextval(%s) FROM generate_series(1, %s)",
+            ['ir_sequence_%03d' % sequence.id, count])
+        return [f"GRE-{sequence.get_next_char(row[0])}" for row in self.env.cr.fetchall()]
+    
     @api.constrains('price')
     def _check_price(self):
         for record in self:
@@ -353,6 +522,86 @@ class GhanaRealEstateProperty(models.Model):
             if record.bathrooms < 0:
                 raise ValidationError(_('Number of bathrooms cannot be negative.'))
     
+    # CRUD Methods
+    @api.model_create_multi
+    def create(self, vals_list):
+        # Codes are reserved per batch instead of one sequence call per record
+        missing = [vals for vals in vals_list if not vals.get('property_code')]
+        if missing:
+            for vals, code in zip(missing, self._reserve_property_codes(len(missing))):
+                vals['property_code'] = code
+        records = super().create(vals_list)
+        records._mark_city_counters()
+        self.env['ghana_real_estate.website.cache']._bump_data_version('listing')
+        return records
+    
+    def write(self, vals):
+        if SIMILARITY_FIELDS.intersection(vals):
+            vals = dict(vals, similarity_dirty=True)
+        if LISTING_FIELDS.intersection(vals):
+            self.env['ghana_real_estate.website.cache']._bump_data_version('listing')
+        if 'state' in vals and 'off_market_date' not in vals:
+            vals = dict(vals, off_market_date=fields.Date.today() if vals['state'] in OFF_MARKET_STATES else False)
+        update_cities = bool(CITY_COUNTER_FIELDS.intersection(vals))
+        if update_cities:
+            # Cities the records leave, those they join are marked after the write
+            self._mark_city_counters()
+        res = super().write(vals)
+        if update_cities:
+            self._mark_city_counters()
+        return res
+    
+    def unlink(self):
+        self._mark_city_counters()
+        self.env['ghana_real_estate.syndication.deletion']._record(self)
+        self.env['ghana_real_estate.website.cache']._bump_data_version('listing')
+        return super().unlink()
+    
+    # Materialized Counters
+    @api.model
+    def _get_counter_domain(self):
+        # Counters count exactly what the website lists
+        return self.env['ghana_real_estate.property.search']._get_base_domain()
+    
+    @api.model
+    def _read_website_counts(self, field_name, records):
+        """Return {record id: number of website properties} for a many2one
+        field pointing to ``records``, in a single grouped query.
+        """
+        ids = [record_id for record_id in records._origin.ids if record_id]
+        if not ids:
+            return {}
+        groups = self.read_group(
+            self._get_counter_domain() + [(field_name, 'in', ids)],
+            [field_name], [field_name])
+        return {group[field_name][0]: group[f'{field_name}_count'] for group in groups}
+    
+    def _mark_city_counters(self):
+        """Schedule the recompute of the counters of the cities of these properties"""
+        pairs = {(record.location_id.id, record.city) for record in self if record.city and record.location_id}
+        if not pairs:
+            return
+        City = self.env['ghana_real_estate.city']
+        cities = City.with_context(active_test=False).search([
+            ('region_id', 'in', list({pair[0] for pair in pairs})),
+            ('name', 'in', list({pair[1] for pair in pairs})),
+        ])
+        self.env.add_to_compute(City._fields['property_count'], cities)
+    
+    @api.model
+    def action_rebuild_property_counters(self):
+        """Recompute every materialized property counter, for repairs"""
+        counters = [
+            ('ghana_real_estate.property.type', 'property_count'),
+            ('ghana_real_estate.location', 'property_count'),
+            ('ghana_real_estate.city', 'property_count'),
+            ('ghana_real_estate.agent', 'properties_count'),
+        ]
+        for model_name, field_name in counters:
+            Model = self.env[model_name].with_context(active_test=False)
+            self.env.add_to_compute(Model._fields[field_name], Model.search([]))
+        self.env.flush_all()
+    
     # Action Methods
     def action_publish(self):
         """Publish property on website"""
@@ -374,6 +623,189 @@ class GhanaRealEstateProperty(models.Model):
         """Reset property to available"""
         self.write({'state': 'available'})
     
+    # Bulk Lifecycle Transitions
+    @api.model
+    def bulk_transition(self, ids, transition, chunk_size=LIFECYCLE_CHUNK_SIZE):
+        """Apply a lifecycle transition to many properties (RPC entry point).
+        
+        Records are validated and written chunk by chunk, with one write and
+        one recompute pass per chunk, and the website caches are invalidated
+        once at the end. Returns the ids that were transitioned, the ids whose
+        state does not allow the transition and the ids that do not exist.
+        """
+        if transition not in LIFECYCLE_TRANSITIONS:
+            raise UserError(_('Unknown property transition: %s', transition))
+        source_states, vals = LIFECYCLE_TRANSITIONS[transition]
+        vals = dict(vals)
+        if vals.get('state') == 'sold':
+            vals['sold_date'] = fields.Date.today()
+        
+        Property = self.with_context(active_test=False, defer_website_cache_invalidation=True)
+        summary = {'transition': transition, 'done': [], 'skipped': [], 'missing': []}
+        for chunk_ids in split_every(max(chunk_size, 1), list(dict.fromkeys(ids))):
+            states = {row['id']: row['state']
+                      for row in Property.search_read([('id', 'in', list(chunk_ids))], ['state'])}
+            valid = []
+            for record_id in chunk_ids:
+                state = states.get(record_id)
+                if state is None:
+                    summary['missing'].append(record_id)
+                elif source_states is None or state in source_states:
+                    valid.append(record_id)
+                else:
+                    summary['skipped'].append({'id': record_id, 'state': state})
+            if valid:
+                Property.browse(valid).write(vals)
+                self.env.flush_all()
+                self.env.invalidate_all()
+                summary['done'].extend(valid)
+        
+        if summary['done']:
+            self.env['ghana_real_estate.website.cache'].with_context(
+                defer_website_cache_invalidation=False)._invalidate_website_caches()
+        return summary
+    
+    def action_bulk_transition(self, transition):
+        """Server action helper: transition the selected records and notify"""
+        summary = self.bulk_transition(self.ids, transition)
+        message = _('%(done)s properties updated, %(skipped)s skipped because of their status.',
+                    done=len(summary['done']), skipped=len(summary['skipped']))
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Bulk Update'),
+                'message': message,
+                'type': 'warning' if summary['skipped'] else 'success',
+                'sticky': False,
+            },
+        }
+    
+    def _get_main_image_map(self, size='card', image_format='jpeg'):
+        """Return {property id: image URL} of the main image of each property,
+        read in a single query without loading any image binary. The URL points
+        to the requested variant when it has been generated.
+        """
+        if not self.ids:
+            return {}
+        Image = self.env['ghana_real_estate.property.image']
+        Variant = self.env['ghana_real_estate.property.image.variant']
+        self.flush_model(['main_image_id'])
+        Variant.flush_model(['image_id', 'size', 'image_format'])
+        self.env.cr.execute("""
+            SELECT property.id, image.id, image.write_date, variant.id, variant.write_date
+              FROM ghana_real_estate_property property
+              JOIN ghana_real_estate_property_image image
+                ON image.id = property.main_image_id
+         LEFT JOIN ghana_real_estate_property_image_variant variant
+                ON variant.image_id = image.id
+               AND variant.size = %s
+               AND variant.image_format = %s
+             WHERE property.id IN %s
+        """, [size, image_format, tuple(self.ids)])
+        return {
+            property_id: (
+                image_url(Variant._name, variant_id, 'datas', variant_date) if variant_id
+                else image_url(Image._name, image_id, 'image', write_date)
+            )
+            for property_id, image_id, write_date, variant_id, variant_date in self.env.cr.fetchall()
+        }
+    
+    def _get_card_data(self):
+        """Serialize properties for the JSON APIs, in batch"""
+        images = self._get_main_image_map()
+        return [{
+            'id': record.id,
+            'name': record.name,
+            'price': record.price,
+            'display_price': record.display_price,
+            'city': record.city,
+            'bedrooms': record.bedrooms,
+            'bathrooms': record.bathrooms,
+            'image_url': images.get(record.id, False),
+            'url': f'/property/{record.id}',
+        } for record in self]
+    
+    def _get_similar_properties(self, limit=4):
+        """Precomputed similar properties still on the website, best first"""
+        self.ensure_one()
+        neighbours = self.env['ghana_real_estate.property.similarity'].sudo().search_read(
+            [('property_id', '=', self.id)], ['similar_id'], order='rank')
+        similar = self.browse([row['similar_id'][0] for row in neighbours])
+        return similar.filtered(lambda p: p.website_published and p.state in WEBSITE_STATES)[:limit]
+    
+    def _get_api_data(self, field_names=None):
+        """Serialize properties for the batch API with only ``field_names``.
+        
+        Every relation is read once for the whole recordset and images are
+        returned as URLs, so the cost grows with the requested fields rather
+        than with the number of properties.
+        """
+        allowed = set(API_SCALAR_FIELDS + API_RELATION_FIELDS)
+        field_names = [name for name in (field_names or API_DEFAULT_FIELDS) if name in allowed]
+        requested = set(field_names)
+        
+        # Prefetch the requested relations in one query per level
+        main_images = self._get_main_image_map() if 'image_url' in requested else {}
+        if 'images' in requested:
+            self.image_ids.variant_ids.mapped('size')
+        if 'features' in requested:
+            self.feature_ids.mapped('name')
+        if 'property_type' in requested:
+            self.property_type_id.mapped('name')
+        if 'agent' in requested:
+            self.agent_id.mapped('name')
+        if 'location' in requested:
+            self.location_id.mapped('name')
+        
+        result = []
+        for record in self:
+            data = {'id': record.id}
+            for name in field_names:
+                if name in API_SCALAR_FIELDS:
+                    data[name] = record[name]
+                elif name == 'url':
+                    data['url'] = f'/property/{record.id}'
+                elif name == 'image_url':
+                    data['image_url'] = main_images.get(record.id, False)
+                elif name == 'images':
+                    data['images'] = [{
+                        'id': image.id,
+                        'is_main': image.is_main,
+                        'url': image._get_variant_url('detail'),
+                        'thumbnail_url': image._get_variant_url('thumbnail'),
+                    } for image in record.image_ids]
+                elif name == 'features':
+                    data['features'] = record.feature_ids.mapped('name')
+                elif name == 'property_type':
+                    data['property_type'] = record.property_type_id.name or False
+                elif name == 'agent':
+                    agent = record.agent_id
+                    data['agent'] = agent and {
+                        'id': agent.id,
+                        'name': agent.name,
+                        'phone': agent.phone,
+                        'email': agent.email,
+                        'photo_url': image_url(agent._name, agent.id, 'photo', agent.write_date),
+                        'url': f'/agent/{agent.id}',
+                    } or False
+                elif name == 'location':
+                    location = record.location_id
+                    data['location'] = location and {
+                        'id': location.id,
+                        'name': location.name,
+                        'code': location.code,
+                    } or False
+            result.append(data)
+        return result
+    
+    def _get_card_html(self):
+        """Website card of the property, served from the fragment cache"""
+        self.ensure_one()
+        return self.env['ghana_real_estate.website.cache']._render_fragment(
+            'ghana_real_estate.property_card', self, {'property': self},
+            dependencies=(self.main_image_id, self.location_id))
+    
     def get_absolute_url(self):
         """Get absolute URL for website"""
         return f"/property/{self.id}"
@@ -384,11 +816,81 @@ class GhanaRealEstateProperty(models.Model):
         ('positive_price', 'CHECK(price > 0)', 'Price must be greater than zero!'),
     ]
     
+    def init(self):
+        # Weighted text search vector, maintained by PostgreSQL on every write
+        self.env.cr.execute(f"""
+            ALTER TABLE "{self._table}" ADD COLUMN IF NOT EXISTS search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('{FTS_CONFIG}', coalesce(name, '{{}}'::jsonb)), 'A')
+                || setweight(to_tsvector('{FTS_CONFIG}', coalesce(city, '') || ' ' || coalesce(search_tags, '')), 'B')
+                || setweight(to_tsvector('{FTS_CONFIG}', coalesce(search_document, '')), 'C')
+            ) STORED
+        """)
+        create_index(self.env.cr, 'ghana_real_estate_property_search_vector_idx',
+                     self._table, ['search_vector'], method='gin')
+        # Small partial indexes serving the windows of the availability job
+        create_index(self.env.cr, 'ghana_real_estate_property_off_plan_date_idx',
+                     self._table, ['availability_date'], where="state = 'off_plan'")
+        create_index(self.env.cr, 'ghana_real_estate_property_stale_write_date_idx',
+                     self._table, ['write_date'], where="state IN ('draft', 'pending')")
+    
     # Cron Jobs
+    @api.model
     def update_property_availability(self):
-        """Update property availability status"""
-        # This method can be called by a cron job
-        pass
+        """Update property availability status.
+        
+        Off plan properties whose availability date has arrived become
+        available and draft or pending listings left untouched for too long
+        expire. Only the records that changed or crossed a date since the last
+        successful run are considered, and they are processed in batches that
+        are committed one by one. When the time budget is exhausted the run
+        stops as partial and the next run resumes from the same watermark.
+        """
+        get_param = self.env['ir.config_parameter'].sudo().get_param
+        stale_days = int(get_param('ghana_real_estate.stale_listing_days', AVAILABILITY_STALE_DAYS))
+        batch_size = int(get_param('ghana_real_estate.availability_batch_size', AVAILABILITY_BATCH_SIZE))
+        time_budget = int(get_param('ghana_real_estate.availability_time_budget', AVAILABILITY_TIME_BUDGET))
+        
+        JobRun = self.env['ghana_real_estate.job.run']
+        watermark = JobRun._get_last_run(AVAILABILITY_JOB).started_at
+        run = JobRun._start(AVAILABILITY_JOB)
+        self.env.cr.commit()
+        
+        now = fields.Datetime.now()
+        today = fields.Date.context_today(self)
+        stale_before = now - timedelta(days=stale_days)
+        available_domain = [('state', '=', 'off_plan'), ('availability_date', '<=', today)]
+        stale_domain = [('state', 'in', ['draft', 'pending']), ('write_date', '<=', stale_before)]
+        if watermark:
+            available_domain += ['|',
+                                 ('availability_date', '>', watermark.date()),
+                                 ('write_date', '>', watermark)]
+            stale_domain += [('write_date', '>', watermark - timedelta(days=stale_days))]
+        
+        started = time.time()
+        stats = {'watermark': watermark, 'available': 0, 'expired': 0, 'skipped': 0, 'batches': 0}
+        state = 'done'
+        try:
+            for transition, domain, counter in [
+                ('reset_to_available', available_domain, 'available'),
+                ('expire', stale_domain, 'expired'),
+            ]:
+                for batch_ids in split_every(max(batch_size, 1), self.search(domain, order='id').ids):
+                    if time.time() - started > time_budget:
+                        state = 'partial'
+                        break
+                    summary = self.bulk_transition(list(batch_ids), transition, chunk_size=batch_size)
+                    stats[counter] += len(summary['done'])
+                    stats['skipped'] += len(summary['skipped'])
+                    stats['batches'] += 1
+                    self.env.cr.commit()
+        except Exception as e:
+            self.env.cr.rollback()
+            _logger.exception('Property availability update failed')
+            run._finish('failed', stats['available'] + stats['expired'], stats, str(e))
+        else:
+            run._finish(state, stats['available'] + stats['expired'], stats)
+        self.env.cr.commit()
     
     # Website URL
     def website_url(self):
@@ -440,6 +942,120 @@ class GhanaRealEstatePropertyImage(models.Model):
         string='Description'
     )
     
+    # Original dimensions and responsive derivatives
+    width = fields.Integer(
+        string='Width',
+        readonly=True
+    )
+    
+    height = fields.Integer(
+        string='Height',
+        readonly=True
+    )
+    
+    variant_ids = fields.One2many(
+        'ghana_real_estate.property.image.variant',
+        'image_id',
+        string='Variants'
+    )
+    
+    variant_state = fields.Selection([
+        ('pending', 'Pending'),
+        ('done', 'Generated'),
+        ('failed', 'Failed'),
+    ], string='Variants Status',
+       default='pending',
+       readonly=True,
+       copy=False,
+       index=True
+    )
+    
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._schedule_variant_generation()
+        return records
+    
+    def write(self, vals):
+        if 'image' in vals:
+            vals = dict(vals, variant_state='pending')
+        res = super().write(vals)
+        if 'image' in vals:
+            self._schedule_variant_generation()
+        return res
+    
+    def _schedule_variant_generation(self):
+        """Generate the variants in the background, not in the form save"""
+        cron = self.env.ref('ghana_real_estate.ir_cron_generate_image_variants',
+                            raise_if_not_found=False)
+        if cron:
+            cron._trigger()
+    
+    @api.model
+    def _cron_generate_image_variants(self, batch_size=50):
+        """Process a batch of pending images, re-triggering while some remain"""
+        images = self.search([('variant_state', '=', 'pending')], limit=batch_size + 1)
+        images[:batch_size]._generate_variants()
+        if len(images) > batch_size:
+            self._schedule_variant_generation()
+    
+    def _generate_variants(self):
+        Variant = self.env['ghana_real_estate.property.image.variant']
+        for record in self:
+            try:
+                original = ImageProcess(base64.b64decode(record.image)).image
+                vals_list = []
+                for size, side in IMAGE_VARIANT_SIZES:
+                    resized = original.copy()
+                    # thumbnail() keeps the aspect ratio and never upscales
+                    resized.thumbnail((side, side))
+                    for image_format in IMAGE_VARIANT_FORMATS:
+                        if image_format == 'jpeg':
+                            frame = resized.convert('RGB')
+                        elif resized.mode not in ('RGB', 'RGBA'):
+                            frame = resized.convert('RGBA')
+                        else:
+                            frame = resized
+                        output = io.BytesIO()
+                        frame.save(output, format=image_format.upper(),
+                                   quality=IMAGE_VARIANT_QUALITY)
+                        vals_list.append({
+                            'image_id': record.id,
+                            'size': size,
+                            'image_format': image_format,
+                            'width': resized.width,
+                            'height': resized.height,
+                            'datas': base64.b64encode(output.getvalue()),
+                        })
+            except Exception:
+                _logger.exception('Could not generate variants for property image %s', record.id)
+                record.write({'variant_state': 'failed'})
+                continue
+            record.variant_ids.unlink()
+            Variant.create(vals_list)
+            record.write({
+                'width': original.width,
+                'height': original.height,
+                'variant_state': 'done',
+            })
+    
+    def _get_variant_url(self, size='card', image_format='jpeg'):
+        """URL of a variant, falling back to the original image"""
+        self.ensure_one()
+        for variant in self.variant_ids:
+            if variant.size == size and variant.image_format == image_format:
+                return image_url(variant._name, variant.id, 'datas', variant.write_date)
+        return image_url(self._name, self.id, 'image', self.write_date)
+    
+    def _get_srcset(self, image_format):
+        """srcset attribute listing every variant of a format with its width"""
+        self.ensure_one()
+        variants = self.variant_ids.filtered(lambda v: v.image_format == image_format)
+        return ', '.join(
+            '%s %sw' % (image_url(v._name, v.id, 'datas', v.write_date), v.width)
+            for v in variants.sorted('width')
+        )
+    
     @api.constrains('is_main')
     def _check_single_main_image(self):
         """Ensure only one main image per property"""
@@ -454,6 +1070,53 @@ class GhanaRealEstatePropertyImage(models.Model):
                     existing.write({'is_main': False})
 
 
+class GhanaRealEstatePropertyImageVariant(models.Model):
+    """Resized and re-encoded derivative of a property image"""
+    
+    _name = 'ghana_real_estate.property.image.variant'
+    _description = 'Property Image Variant'
+    _order = 'image_id, width'
+    
+    image_id = fields.Many2one(
+        'ghana_real_estate.property.image',
+        string='Image',
+        required=True,
+        ondelete='cascade',
+        index=True
+    )
+    
+    size = fields.Selection(
+        [(size, size.capitalize()) for size, side in IMAGE_VARIANT_SIZES],
+        string='Size',
+        required=True
+    )
+    
+    image_format = fields.Selection([
+        ('webp', 'WebP'),
+        ('jpeg', 'JPEG'),
+    ], string='Format',
+       required=True
+    )
+    
+    width = fields.Integer(
+        string='Width'
+    )
+    
+    height = fields.Integer(
+        string='Height'
+    )
+    
+    datas = fields.Binary(
+        string='Image',
+        attachment=True,
+        required=True
+    )
+    
+    _sql_constraints = [
+        ('unique_variant', 'UNIQUE(image_id, size, image_format)', 'Image variants must be unique!'),
+    ]
+
+
 class GhanaRealEstatePropertyFeature(models.Model):
     """Property Features and Amenities Model"""
     
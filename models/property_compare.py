@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+from odoo import models, api, tools, _
+
+# Most properties shown side by side
+COMPARE_MAX_PROPERTIES = 4
+
+# Compared fields as (field name, kind): numbers get min/max markers, measures
+# too but ignore 0 which means "unknown", texts are only checked for differences
+COMPARE_FIELDS = [
+    ('price', 'number'),
+    ('property_type_id', 'text'),
+    ('transaction_type', 'text'),
+    ('city', 'text'),
+    ('location_id', 'text'),
+    ('bedrooms', 'number'),
+    ('bathrooms', 'number'),
+    ('building_size', 'measure'),
+    ('land_size', 'measure'),
+    ('parking_spaces', 'number'),
+    ('year_built', 'measure'),
+    ('furnished', 'text'),
+]
+
+
+class GhanaRealEstatePropertyCompare(models.AbstractModel):
+    """Side by side comparison of published properties"""
+
+    _name = 'ghana_real_estate.property.compare'
+    _description = 'Property Comparison'
+
+    @api.model
+    def _normalize_ids(self, raw_ids):
+        """Parse "3,1,3,x" into the sorted tuple of at most 4 distinct ids"""
+        ids = []
+        for part in (raw_ids or '').split(','):
+            part = part.strip()
+            if part.isdigit() and int(part) not in ids:
+                ids.append(int(part))
+        return tuple(sorted(ids[:COMPARE_MAX_PROPERTIES]))
+
+    @api.model
+    def _get_comparison(self, property_ids):
+        """Return the comparison matrix of the published properties among
+        ``property_ids``.
+
+        One small query validates the ids and reads their write dates, the
+        matrix itself is cached per set of (id, write date) and language.
+        """
+        Property = self.env['ghana_real_estate.property']
+        domain = self.env['ghana_real_estate.property.search']._get_base_domain()
+        rows = Property.search_read(domain + [('id', 'in', list(property_ids))], ['write_date'], order='id')
+        signature = tuple((row['id'], str(row['write_date'])) for row in rows)
+        return self._build_comparison(signature, self.env.lang)
+
+    @tools.ormcache('signature', 'lang')
+    def _build_comparison(self, signature, lang):
+        self = self.with_context(lang=lang)
+        env = self.env
+        Property = env['ghana_real_estate.property'].sudo()
+        properties = Property.browse([property_id for property_id, _write_date in signature])
+        # Prefetch the relations of every compared property at once
+        properties.mapped('property_type_id.name')
+        properties.mapped('location_id.name')
+        properties.mapped('feature_ids.name')
+
+        result_rows = []
+        for field_name, kind in COMPARE_FIELDS:
+            field = Property._fields[field_name]
+            values = [prop[field_name] for prop in properties]
+            cells = [{'value': self._format_value(prop, field, value, kind), 'is_min': False, 'is_max': False}
+                     for prop, value in zip(properties, values)]
+            keys = [value.id if field.type == 'many2one' else value for value in values]
+            differs = len(set(keys)) > 1
+            if differs and kind in ('number', 'measure'):
+                ranked = [value for value in values if kind == 'number' or value]
+                if len(set(ranked)) > 1:
+                    low, high = min(ranked), max(ranked)
+                    for cell, value in zip(cells, values):
+                        if kind == 'number' or value:
+                            cell['is_min'] = value == low
+                            cell['is_max'] = value == high
+            result_rows.append({
+                'key': field_name,
+                'label': field._description_string(env),
+                'cells': cells,
+                'differs': differs,
+            })
+
+        features = []
+        for feature in properties.feature_ids.sorted('name'):
+            has = [feature in prop.feature_ids for prop in properties]
+            features.append({
+                'name': feature.name,
+                'has': has,
+                'differs': len(set(has)) > 1,
+            })
+
+        return {
+            'property_ids': properties.ids,
+            'columns': [{'id': prop.id, 'name': prop.name, 'url': f'/property/{prop.id}'}
+                        for prop in properties],
+            'rows': result_rows,
+            'features': features,
+        }
+
+    @api.model
+    def _format_value(self, record, field, value, kind):
+        if field.name == 'price':
+            return record.display_price
+        if field.type == 'many2one':
+            return value.display_name or ''
+        if field.type == 'selection':
+            return dict(field._description_selection(self.env)).get(value, '')
+        if field.type == 'boolean':
+            return _('Yes') if value else _('No')
+        if kind == 'measure' and not value:
+            return '-'
+        return value if value is not None else ''
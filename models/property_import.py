@@ -0,0 +1,334 @@
+# -*- coding: utf-8 -*-
+import base64
+import csv
+import io
+import json
+import logging
+import tempfile
+import time
+
+import requests
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from odoo.tools import split_every
+
+_logger = logging.getLogger(__name__)
+
+# Columns of a feed row that map directly onto property fields
+DIRECT_FIELDS = {
+    'name': str,
+    'city': str,
+    'address': str,
+    'description': str,
+    'transaction_type': str,
+    'search_tags': str,
+    'price': float,
+    'bedrooms': int,
+    'bathrooms': int,
+    'floors': int,
+    'parking_spaces': int,
+    'land_size': float,
+    'building_size': float,
+    'latitude': float,
+    'longitude': float,
+    'year_built': int,
+}
+
+BOOLEAN_FIELDS = ['featured', 'furnished', 'pets_allowed', 'website_published']
+
+IMAGE_DOWNLOAD_TIMEOUT = 10
+
+
+class GhanaRealEstatePropertyImport(models.Model):
+    """Streaming bulk import of partner property feeds"""
+
+    _name = 'ghana_real_estate.property.import'
+    _description = 'Property Feed Import'
+    _order = 'create_date desc'
+
+    name = fields.Char(
+        string='Feed Name',
+        required=True
+    )
+
+    feed_file = fields.Binary(
+        string='Feed File',
+        attachment=True,
+        required=True
+    )
+
+    feed_filename = fields.Char(
+        string='File Name'
+    )
+
+    file_format = fields.Selection([
+        ('csv', 'CSV'),
+        ('jsonl', 'JSON Lines'),
+    ], string='Format',
+       required=True,
+       default='csv'
+    )
+
+    chunk_size = fields.Integer(
+        string='Chunk Size',
+        default=500
+    )
+
+    state = fields.Selection([
+        ('draft', 'Draft'),
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status',
+       default='draft',
+       required=True,
+       readonly=True,
+       index=True
+    )
+
+    # Progress, updated and committed after every chunk
+    rows_processed = fields.Integer(
+        string='Rows Processed',
+        readonly=True
+    )
+
+    rows_created = fields.Integer(
+        string='Properties Created',
+        readonly=True
+    )
+
+    rows_failed = fields.Integer(
+        string='Rows Failed',
+        readonly=True
+    )
+
+    chunks_done = fields.Integer(
+        string='Chunks Done',
+        readonly=True
+    )
+
+    progress_message = fields.Char(
+        string='Progress',
+        readonly=True
+    )
+
+    error_report = fields.Binary(
+        string='Error Report',
+        attachment=True,
+        readonly=True
+    )
+
+    error_report_name = fields.Char(
+        string='Error Report Name',
+        readonly=True
+    )
+
+    # Action Methods
+    def action_start(self):
+        """Queue the import for the background worker"""
+        self.write({'state': 'queued', 'progress_message': _('Waiting for the import worker')})
+        self.env.ref('ghana_real_estate.ir_cron_process_property_imports')._trigger()
+
+    def action_reset(self):
+        """Reset the import so that it runs again from the first row"""
+        self.write({
+            'state': 'draft',
+            'rows_processed': 0,
+            'rows_created': 0,
+            'rows_failed': 0,
+            'chunks_done': 0,
+            'progress_message': False,
+            'error_report': False,
+            'error_report_name': False,
+        })
+
+    # Cron Jobs
+    @api.model
+    def _cron_process_imports(self):
+        """Run queued imports, resuming interrupted ones after their last chunk"""
+        for feed in self.search([('state', 'in', ['queued', 'running'])], order='id'):
+            feed._run_import()
+
+    def _run_import(self):
+        self.ensure_one()
+        self.write({'state': 'running'})
+        self.env.cr.commit()
+
+        lookups = self._load_lookups()
+        errors = tempfile.SpooledTemporaryFile(max_size=1024 * 1024, mode='w+', newline='')
+        writer = csv.writer(errors)
+        writer.writerow(['line', 'error'])
+        try:
+            rows = self._iter_rows()
+            # Skip rows committed by an interrupted previous run
+            for _skip in range(self.rows_processed):
+                next(rows, None)
+            for chunk in split_every(max(self.chunk_size, 1), rows):
+                started = time.time()
+                created, failed = self._import_chunk(chunk, lookups, writer)
+                self.write({
+                    'rows_processed': self.rows_processed + len(chunk),
+                    'rows_created': self.rows_created + created,
+                    'rows_failed': self.rows_failed + failed,
+                    'chunks_done': self.chunks_done + 1,
+                    'progress_message': _('Chunk %(chunk)s: %(created)s created, %(failed)s failed in %(seconds).1fs',
+                                          chunk=self.chunks_done + 1, created=created,
+                                          failed=failed, seconds=time.time() - started),
+                })
+                self.env.cr.commit()
+                # Keep memory flat whatever the size of the feed
+                self.env.invalidate_all()
+        except Exception as e:
+            self.env.cr.rollback()
+            _logger.exception('Property feed import %s failed', self.id)
+            self.write({'state': 'failed', 'progress_message': str(e)})
+        else:
+            self.write({'state': 'done'})
+        finally:
+            self._store_error_report(errors)
+            errors.close()
+        self.env['ghana_real_estate.website.cache']._invalidate_website_caches()
+        self.env.cr.commit()
+
+    def _iter_rows(self):
+        """Yield (line number, row dict, parse error) without loading the feed in memory"""
+        attachment = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_field', '=', 'feed_file'),
+            ('res_id', '=', self.id),
+        ], limit=1)
+        if not attachment:
+            raise UserError(_('The feed file is missing.'))
+        if attachment.store_fname:
+            stream = open(attachment._full_path(attachment.store_fname), 'rb')
+        else:
+            stream = io.BytesIO(attachment.raw)
+        with io.TextIOWrapper(stream, encoding='utf-8-sig', newline='') as text:
+            if self.file_format == 'csv':
+                reader = csv.DictReader(text)
+                for row in reader:
+                    yield reader.line_num, row, None
+            else:
+                for line_number, line in enumerate(text, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        yield line_number, json.loads(line), None
+                    except ValueError as e:
+                        yield line_number, None, str(e)
+
+    def _load_lookups(self):
+        """Code to id maps, loaded once per import run"""
+        def code_map(model_name, key):
+            records = self.env[model_name].with_context(active_test=False).search_read([], [key])
+            return {record[key]: record['id'] for record in records if record[key]}
+
+        return {
+            'property_type': code_map('ghana_real_estate.property.type', 'code'),
+            'location': code_map('ghana_real_estate.location', 'code'),
+            'agent_license': code_map('ghana_real_estate.agent', 'license_number'),
+            'agent_email': code_map('ghana_real_estate.agent', 'email'),
+            'feature': code_map('ghana_real_estate.property.feature', 'name'),
+        }
+
+    def _prepare_property_vals(self, row, lookups):
+        """Convert a feed row into property values, raising ValueError on bad data"""
+        vals = {}
+        for field_name, convert in DIRECT_FIELDS.items():
+            value = row.get(field_name)
+            if value not in (None, ''):
+                vals[field_name] = convert(value)
+        for field_name in BOOLEAN_FIELDS:
+            value = row.get(field_name)
+            if value not in (None, ''):
+                vals[field_name] = str(value).strip().lower() in ('1', 'true', 'yes', 'y')
+
+        for column, key, field_name in [
+            ('property_type', 'property_type', 'property_type_id'),
+            ('location', 'location', 'location_id'),
+        ]:
+            code = row.get(column)
+            if code not in lookups[key]:
+                raise ValueError(_('Unknown %(column)s code %(code)r', column=column, code=code))
+            vals[field_name] = lookups[key][code]
+
+        agent = row.get('agent')
+        agent_id = lookups['agent_license'].get(agent) or lookups['agent_email'].get(agent)
+        if not agent_id:
+            raise ValueError(_('Unknown agent %r', agent))
+        vals['agent_id'] = agent_id
+
+        features = [name.strip() for name in (row.get('features') or '').split('|') if name.strip()]
+        unknown = [name for name in features if name not in lookups['feature']]
+        if unknown:
+            raise ValueError(_('Unknown features: %s', ', '.join(unknown)))
+        if features:
+            vals['feature_ids'] = [(6, 0, [lookups['feature'][name] for name in features])]
+        return vals
+
+    def _import_chunk(self, chunk, lookups, writer):
+        """Create the properties of a chunk in batch, isolating bad rows on failure"""
+        Property = self.env['ghana_real_estate.property'].with_context(
+            defer_website_cache_invalidation=True)
+        prepared = []
+        failed = 0
+        for line_number, row, error in chunk:
+            if error is None:
+                try:
+                    prepared.append((line_number, row, self._prepare_property_vals(row, lookups)))
+                    continue
+                except (ValueError, TypeError) as e:
+                    error = str(e)
+            writer.writerow([line_number, error])
+            failed += 1
+
+        records = []
+        try:
+            with self.env.cr.savepoint():
+                records = list(zip(prepared, Property.create([vals for _line, _row, vals in prepared])))
+        except Exception:
+            # Fall back to one savepoint per row to report the faulty ones
+            for item in prepared:
+                try:
+                    with self.env.cr.savepoint():
+                        records.append((item, Property.create(item[2])))
+                except Exception as e:
+                    writer.writerow([item[0], str(e)])
+                    failed += 1
+
+        image_vals = []
+        for (line_number, row, _vals), record in records:
+            urls = [url.strip() for url in (row.get('image_urls') or '').split('|') if url.strip()]
+            for sequence, url in enumerate(urls):
+                content = self._download_image(url, line_number, writer)
+                if content:
+                    image_vals.append({
+                        'property_id': record.id,
+                        'image': base64.b64encode(content),
+                        'sequence': sequence,
+                    })
+        if image_vals:
+            self.env['ghana_real_estate.property.image'].create(image_vals)
+        return len(records), failed
+
+    def _download_image(self, url, line_number, writer):
+        try:
+            response = requests.get(url, timeout=IMAGE_DOWNLOAD_TIMEOUT)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            writer.writerow([line_number, _('Image %(url)s skipped: %(error)s', url=url, error=e)])
+            return None
+        return response.content
+
+    def _store_error_report(self, errors):
+        errors.seek(0)
+        report = errors.read()
+        # Only the header row means there is nothing to report
+        if report.count('\n') <= 1:
+            return
+        self.write({
+            'error_report': base64.b64encode(report.encode()),
+            'error_report_name': f'{self.name}_errors.csv',
+        })
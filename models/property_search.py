@@ -0,0 +1,649 @@
+# -*- coding: utf-8 -*-
+import base64
+import json
+import math
+from datetime import datetime
+from urllib.parse import quote
+
+from odoo import models, api
+from odoo.tools.lru import LRU
+from odoo.tools.sql import create_index
+
+from . import geo
+from .utils import to_float, to_int
+from .property import FTS_CONFIG
+from .website_cache import WEBSITE_STATES
+
+# Sort orders accepted from the website and the search API
+ALLOWED_ORDERS = ['create_date desc', 'price asc', 'price desc', 'name asc', 'relevance', 'distance']
+DEFAULT_ORDER = 'create_date desc'
+
+# Keyset pagination key of each sortable order, as (field, direction)
+ORDER_KEYS = {
+    'create_date desc': ('create_date', 'desc'),
+    'price asc': ('price', 'asc'),
+    'price desc': ('price', 'desc'),
+}
+
+# Orders paginated by offset only, like relevance: the ORM sorts translated
+# names on a per-language expression that no keyset index can serve
+OFFSET_ORDERS = {
+    'name asc': 'name asc, id asc',
+}
+
+# Partial composite indexes matching the (sort key, id) keyset orders
+KEYSET_INDEX_WHERE = "website_published AND active AND state IN ('available', 'draft')"
+KEYSET_INDEXES = [
+    ('ghana_real_estate_property_keyset_create_date_idx', ['create_date DESC', 'id DESC']),
+    ('ghana_real_estate_property_keyset_price_idx', ['price', 'id']),
+]
+# The ORM sorts translated names on a per-language expression, an index on
+# one of them is never used
+OBSOLETE_INDEXES = [
+    'ghana_real_estate_property_keyset_name_idx',
+    # Btree on (latitude, longitude), replaced by the GiST GEO_INDEX
+    'ghana_real_estate_property_geo_idx',
+]
+
+# Spatial index serving the bounding box prefilter of geographic searches
+GEO_INDEX = ('ghana_real_estate_property_geo_gist_idx', ['point(longitude, latitude)'])
+GEO_INDEX_WHERE = KEYSET_INDEX_WHERE + ' AND latitude IS NOT NULL AND longitude IS NOT NULL'
+
+# Price bands as (key, lower bound, upper bound), matching the hero search
+PRICE_BANDS = [
+    ('0-200000', 0, 200000),
+    ('200000-500000', 200000, 500000),
+    ('500000-1000000', 500000, 1000000),
+    ('1000000-', 1000000, None),
+]
+
+# Facet dimensions, in the order of the GROUPING SETS query
+FACET_COLUMNS = [
+    'property_type_id',
+    'location_id',
+    'bedrooms',
+    'bathrooms',
+    'transaction_type',
+    'price_band',
+]
+
+# Thresholds of the "N+" bedroom and bathroom filters
+ROOM_THRESHOLDS = [1, 2, 3, 4, 5]
+
+# Typeahead bounds
+SUGGEST_MIN_LENGTH = 2
+SUGGEST_DEFAULT_LIMIT = 8
+SUGGEST_MAX_LIMIT = 20
+SUGGEST_SIMILARITY_THRESHOLD = 0.3
+
+# Trigram-indexed expressions as (index name, table, expression)
+TRIGRAM_INDEXES = [
+    ('ghana_real_estate_location_name_trgm_idx', 'ghana_real_estate_location', 'name'),
+    ('ghana_real_estate_city_name_trgm_idx', 'ghana_real_estate_city', 'name'),
+    ('ghana_real_estate_property_name_trgm_idx', 'ghana_real_estate_property',
+     "(jsonb_path_query_array(name, '$.*')::text)"),
+    ('ghana_real_estate_property_code_trgm_idx', 'ghana_real_estate_property', 'property_code'),
+]
+
+
+# Map clustering: grid cells per 256px map tile width and zoom bounds
+CLUSTER_CELLS_PER_TILE = 4
+CLUSTER_MAX_ZOOM = 18
+CLUSTER_MAX_CELLS = 2000
+
+# Filters that may narrow the clusters, the rest is ignored
+CLUSTER_FILTERS = (
+    'transaction_type', 'property_type', 'property_type_id', 'location_id',
+    'location_code', 'location', 'search', 'min_price', 'max_price',
+    'price_range', 'bedrooms', 'bathrooms',
+)
+# Free text filters, clusters narrowed by them are computed but not cached
+CLUSTER_TEXT_FILTERS = ('location', 'search')
+CLUSTER_INT_FILTERS = ('property_type_id', 'location_id', 'bedrooms', 'bathrooms')
+CLUSTER_FLOAT_FILTERS = ('min_price', 'max_price')
+CLUSTER_FILTER_MAX_LENGTH = 32
+
+# Per-worker cluster cache, keyed on the listing data version
+CLUSTER_CACHE = LRU(2048)
+
+
+class GhanaRealEstatePropertySearch(models.AbstractModel):
+    """Faceted search over published properties"""
+
+    _name = 'ghana_real_estate.property.search'
+    _description = 'Property Faceted Search'
+
+    def init(self):
+        for index_name in OBSOLETE_INDEXES:
+            self.env.cr.execute(f'DROP INDEX IF EXISTS "{index_name}"')
+        for index_name, expressions in KEYSET_INDEXES:
+            create_index(self.env.cr, index_name, 'ghana_real_estate_property',
+                         expressions, where=KEYSET_INDEX_WHERE)
+        create_index(self.env.cr, GEO_INDEX[0], 'ghana_real_estate_property', GEO_INDEX[1],
+                     method='gist', where=GEO_INDEX_WHERE)
+        # GiST rather than GIN so that the typeahead can use KNN ordering
+        if not self.env.registry.has_trigram:
+            return
+        for index_name, table, expression in TRIGRAM_INDEXES:
+            create_index(self.env.cr, index_name, table,
+                         [f'{expression} gist_trgm_ops'], method='gist')
+
+    @api.model
+    def _get_base_domain(self):
+        return [
+            ('website_published', '=', True),
+            ('state', 'in', list(WEBSITE_STATES)),
+        ]
+
+    @api.model
+    def _build_domain(self, filters):
+        """Translate website/API filter parameters into a property domain"""
+        domain, facet_domains = self._build_facet_domains(filters)
+        for column in FACET_COLUMNS:
+            domain.extend(facet_domains.get(column, []))
+        return domain
+
+    @api.model
+    def _build_facet_domains(self, filters):
+        """Return the domain of the filters that are not facets, and the
+        domain of the filters of each facet dimension. Facets are counted
+        with their own filter left out, see _read_facets().
+        """
+        domain = self._get_base_domain()
+        facet_domains = {}
+
+        if filters.get('transaction_type'):
+            facet_domains['transaction_type'] = [('transaction_type', '=', filters['transaction_type'])]
+
+        # Property type by id (listing routes) or by id/code (forms and API)
+        property_type_id = to_int(filters.get('property_type_id'))
+        property_type = filters.get('property_type')
+        if property_type_id:
+            facet_domains['property_type_id'] = [('property_type_id', '=', property_type_id)]
+        elif property_type:
+            if str(property_type).isdigit():
+                facet_domains['property_type_id'] = [('property_type_id', '=', int(property_type))]
+            else:
+                facet_domains['property_type_id'] = [('property_type_id.code', '=', property_type)]
+
+        location_domain = []
+        location_id = to_int(filters.get('location_id'))
+        if location_id:
+            location_domain.append(('location_id', '=', location_id))
+        if filters.get('location_code'):
+            location_domain.append(('location_id.code', '=', filters['location_code']))
+        if location_domain:
+            facet_domains['location_id'] = location_domain
+        if filters.get('location'):
+            domain.append('|')
+            domain.append(('city', 'ilike', filters['location']))
+            domain.append(('location_id.name', 'ilike', filters['location']))
+
+        search_term = filters.get('search')
+        if search_term:
+            domain.extend(self._get_search_term_domain(search_term))
+
+        # Price range, either explicit bounds or a "min-max" band key
+        min_price = to_float(filters.get('min_price'))
+        max_price = to_float(filters.get('max_price'))
+        price_range = filters.get('price_range')
+        if price_range and '-' in price_range:
+            low, high = price_range.split('-', 1)
+            min_price = to_float(low) if min_price is None else min_price
+            max_price = to_float(high) if max_price is None else max_price
+        price_domain = []
+        if min_price:
+            price_domain.append(('price', '>=', min_price))
+        if max_price:
+            price_domain.append(('price', '<=', max_price))
+        if price_domain:
+            facet_domains['price_band'] = price_domain
+
+        for field_name in ('bedrooms', 'bathrooms'):
+            value = to_int(filters.get(field_name))
+            if value:
+                facet_domains[field_name] = [(field_name, '>=', value)]
+
+        # Geographic filters, "near=lat,lng&radius=km" and "within_bbox=s,w,n,e"
+        near = geo.parse_point(filters.get('near'))
+        if near:
+            domain.extend(self._get_radius_domain(near, filters.get('radius')))
+        bbox = geo.parse_bbox(filters.get('within_bbox'))
+        if bbox:
+            domain.extend(self._get_bbox_domain(bbox))
+
+        return domain, facet_domains
+
+    @api.model
+    def _get_bbox_domain(self, bbox):
+        """Published properties inside a (south, west, north, east) box.
+
+        The subquery repeats the condition of the partial GEO_INDEX so that
+        the box containment is answered by the spatial index.
+        """
+        subquery = f"""
+            SELECT p.id
+              FROM ghana_real_estate_property p
+             WHERE {GEO_INDEX_WHERE}
+               AND {geo.bbox_sql('p')}
+        """
+        return [('id', 'inselect', (subquery, geo.bbox_params(bbox)))]
+
+    @api.model
+    def _get_radius_domain(self, point, radius):
+        """Published properties within ``radius`` km of a point.
+
+        The enclosing box is a spatial index scan, the exact distance is only
+        computed for the rows inside the box.
+        """
+        radius = to_float(radius) or geo.DEFAULT_RADIUS_KM
+        radius = min(max(radius, 0.0), geo.MAX_RADIUS_KM)
+        bbox = geo.bounding_box(point[0], point[1], radius)
+        subquery = f"""
+            SELECT p.id
+              FROM ghana_real_estate_property p
+             WHERE {GEO_INDEX_WHERE}
+               AND {geo.bbox_sql('p')}
+               AND {geo.distance_sql('p')} <= %s
+        """
+        params = geo.bbox_params(bbox) + geo.distance_params(*point) + [radius]
+        return [('id', 'inselect', (subquery, params))]
+
+    @api.model
+    def _get_search_term_domain(self, search_term):
+        # Matches name, city, address, description and tags via search_vector
+        return [('full_text', '=', search_term)]
+
+    @api.model
+    def _normalize_order(self, order):
+        return order if order in ALLOWED_ORDERS else DEFAULT_ORDER
+
+    @api.model
+    def _search_faceted(self, domain, limit=12, offset=0, order=DEFAULT_ORDER, with_facets=True,
+                        search_term=None, cursor=None, origin=None, filters=None):
+        """Return the requested page, the total count and the facet counts.
+
+        With facets the total comes from the same grouped query, so a page
+        costs two queries whatever the number of facet values. When the
+        ``filters`` that built ``domain`` are given, each facet is counted
+        without its own filter so that the other values stay selectable.
+        When a valid cursor is given the page starts right after the cursor
+        record instead of at ``offset``. The distance order needs an
+        ``origin`` point.
+        """
+        Property = self.env['ghana_real_estate.property']
+        order = self._normalize_order(order)
+        next_cursor = None
+        if order == 'relevance' and search_term:
+            records = self._search_ranked(domain, search_term, limit=limit, offset=offset)
+        elif order == 'distance' and origin:
+            records = self._search_by_distance(domain, origin, limit=limit, offset=offset)
+        else:
+            if order in ('relevance', 'distance'):
+                order = DEFAULT_ORDER
+            page_domain = domain
+            position = self._decode_cursor(cursor, order)
+            if position:
+                page_domain = domain + self._get_cursor_domain(order, *position)
+                offset = 0
+            # One extra row tells whether there is a next page
+            records = Property.search(page_domain, limit=limit + 1, offset=offset,
+                                      order=self._get_keyset_order(order))
+            if len(records) > limit:
+                records = records[:limit]
+                if order in ORDER_KEYS:
+                    next_cursor = self._encode_cursor(order, records[-1])
+        if with_facets and filters is not None:
+            total, facets = self._read_facets(*self._build_facet_domains(filters))
+        elif with_facets:
+            total, facets = self._read_facets(domain)
+        else:
+            total, facets = Property.search_count(domain), {}
+        return {
+            'records': records,
+            'total': total,
+            'facets': facets,
+            'next_cursor': next_cursor,
+        }
+
+    @api.model
+    def _get_keyset_order(self, order):
+        """Order with the id tie-breaker that makes keyset positions unique"""
+        if order in OFFSET_ORDERS:
+            return OFFSET_ORDERS[order]
+        field_name, direction = ORDER_KEYS[order]
+        return f'{field_name} {direction}, id {direction}'
+
+    @api.model
+    def _get_cursor_domain(self, order, value, record_id):
+        """Rows after the (value, id) position. The redundant leading bound
+        on the sort key is what lets Postgres start the scan of the keyset
+        index at the position, the OR alone would scan it from the start.
+        """
+        field_name, direction = ORDER_KEYS[order]
+        operator = '<' if direction == 'desc' else '>'
+        return [
+            (field_name, operator + '=', value),
+            '|',
+            (field_name, operator, value),
+            '&', (field_name, '=', value), ('id', operator, record_id),
+        ]
+
+    @api.model
+    def _encode_cursor(self, order, record):
+        """Return an opaque cursor pointing right after ``record``"""
+        field_name = ORDER_KEYS[order][0]
+        value = record[field_name]
+        if field_name == 'create_date':
+            # Keep the microseconds, rows of one transaction share the second
+            value = value.isoformat()
+        payload = json.dumps([order, value, record.id], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    @api.model
+    def _decode_cursor(self, cursor, order):
+        """Return the (value, id) position of a cursor, None if it is invalid
+        or was issued for another sort order.
+        """
+        if not cursor or order not in ORDER_KEYS:
+            return None
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            cursor_order, value, record_id = json.loads(base64.urlsafe_b64decode(padded))
+        except (ValueError, TypeError):
+            return None
+        if cursor_order != order or not isinstance(record_id, int):
+            return None
+        field_name = ORDER_KEYS[order][0]
+        try:
+            if field_name == 'create_date':
+                value = datetime.fromisoformat(value)
+            else:
+                value = float(value)
+        except (ValueError, TypeError):
+            return None
+        return value, record_id
+
+    @api.model
+    def _search_ranked(self, domain, search_term, limit=12, offset=0):
+        """Search the domain ordered by text search rank of the search term"""
+        Property = self.env['ghana_real_estate.property']
+        query = Property._where_calc(domain)
+        Property._apply_ir_rules(query, 'read')
+        from_clause, where_clause, params = query.get_sql()
+        table = Property._table
+        self.env.cr.execute(f"""
+            SELECT "{table}".id
+              FROM {from_clause}
+             WHERE {where_clause or 'TRUE'}
+          ORDER BY ts_rank_cd("{table}".search_vector, to_tsquery(%s, %s)) DESC, "{table}".id DESC
+             LIMIT %s OFFSET %s
+        """, params + [FTS_CONFIG, Property._get_fts_query(search_term), limit, offset])
+        return Property.browse([row[0] for row in self.env.cr.fetchall()])
+
+    @api.model
+    def _get_clusters(self, filters, zoom, bbox):
+        """Return the property clusters of a map viewport.
+
+        The viewport is snapped to the grid of the zoom level, so every
+        viewport covering the same cells shares the same cached result.
+        """
+        zoom = min(max(to_int(zoom) or 0, 0), CLUSTER_MAX_ZOOM)
+        cell = 360.0 / (2 ** zoom) / CLUSTER_CELLS_PER_TILE
+        south, west, north, east = bbox
+        snapped = (
+            max(math.floor(south / cell) * cell, -90.0),
+            max(math.floor(west / cell) * cell, -180.0),
+            min(math.ceil(north / cell) * cell, 90.0),
+            min(math.ceil(east / cell) * cell, 180.0),
+        )
+        filters_key = self._normalize_cluster_filters(filters)
+        if any(key in CLUSTER_TEXT_FILTERS for key, _value in filters_key):
+            return self._read_clusters(filters_key, zoom, snapped)
+
+        cache_key = (self.env['ghana_real_estate.website.cache']._get_data_version('listing'),
+                     filters_key, zoom, snapped)
+        clusters = CLUSTER_CACHE.get(cache_key)
+        if clusters is None:
+            clusters = CLUSTER_CACHE[cache_key] = self._read_clusters(filters_key, zoom, snapped)
+        return clusters
+
+    @api.model
+    def _normalize_cluster_filters(self, filters):
+        """Sorted (key, value) tuple of the valid cluster filters, with typed
+        values so that equivalent requests share one cache entry.
+        """
+        normalized = []
+        for key in CLUSTER_FILTERS:
+            value = filters.get(key)
+            if key in CLUSTER_INT_FILTERS:
+                value = to_int(value)
+            elif key in CLUSTER_FLOAT_FILTERS:
+                value = to_float(value)
+            elif value is not None:
+                value = str(value).strip()[:CLUSTER_FILTER_MAX_LENGTH]
+            if value:
+                normalized.append((key, value))
+        return tuple(normalized)
+
+    @api.model
+    def _read_clusters(self, filters_key, zoom, bbox):
+        """Aggregate the matching properties per grid cell in one query"""
+        Property = self.env['ghana_real_estate.property'].sudo()
+        domain = self._build_domain(dict(filters_key)) + self._get_bbox_domain(bbox)
+        query = Property._where_calc(domain)
+        from_clause, where_clause, params = query.get_sql()
+        table = Property._table
+        cell = 360.0 / (2 ** zoom) / CLUSTER_CELLS_PER_TILE
+        self.env.cr.execute(f"""
+            SELECT COUNT(*), AVG("{table}".latitude), AVG("{table}".longitude),
+                   MIN("{table}".price), MAX("{table}".price), MIN("{table}".id)
+              FROM {from_clause}
+             WHERE {where_clause or 'TRUE'}
+          GROUP BY floor("{table}".latitude / %s), floor("{table}".longitude / %s)
+          ORDER BY COUNT(*) DESC
+             LIMIT %s
+        """, params + [cell, cell, CLUSTER_MAX_CELLS])
+        return tuple(
+            {
+                'count': count,
+                'latitude': round(latitude, 6),
+                'longitude': round(longitude, 6),
+                'min_price': min_price,
+                'max_price': max_price,
+                # Single pins link straight to their property
+                'property_id': property_id if count == 1 else None,
+            }
+            for count, latitude, longitude, min_price, max_price, property_id in self.env.cr.fetchall()
+        )
+
+    @api.model
+    def _search_by_distance(self, domain, origin, limit=12, offset=0):
+        """Search the domain ordered by distance to ``origin``, nearest first"""
+        Property = self.env['ghana_real_estate.property']
+        query = Property._where_calc(domain)
+        Property._apply_ir_rules(query, 'read')
+        from_clause, where_clause, params = query.get_sql()
+        table = Property._table
+        self.env.cr.execute(f"""
+            SELECT "{table}".id
+              FROM {from_clause}
+             WHERE {where_clause or 'TRUE'}
+          ORDER BY {geo.distance_sql(f'"{table}"')} NULLS LAST, "{table}".id
+             LIMIT %s OFFSET %s
+        """, params + geo.distance_params(*origin) + [limit, offset])
+        return Property.browse([row[0] for row in self.env.cr.fetchall()])
+
+    @api.model
+    def _read_facets(self, domain, facet_domains=None):
+        """Count matching properties per facet value in one grouped query.
+
+        ``facet_domains`` holds the filters of the facet dimensions, which
+        are not part of ``domain``: the total matches every filter, while the
+        values of a dimension are counted with all the filters but its own.
+        """
+        Property = self.env['ghana_real_estate.property']
+        facet_domains = facet_domains or {}
+        query = Property._where_calc(domain)
+        Property._apply_ir_rules(query, 'read')
+        from_clause, where_clause, params = query.get_sql()
+        table = Property._table
+
+        # One flag per facet filter, a row counts for a dimension when every
+        # other flag is set
+        flags, flag_params = [], []
+        for column in FACET_COLUMNS:
+            if facet_domains.get(column):
+                _from, flag_where, flag_where_params = Property._where_calc(facet_domains[column]).get_sql()
+                flags.append(f'COALESCE({flag_where}, FALSE)')
+                flag_params += flag_where_params
+            else:
+                flags.append('TRUE')
+
+        def matches(skipped=None):
+            return ' AND '.join(f'matches_{column}' for index, column in enumerate(FACET_COLUMNS)
+                                if index != skipped and facet_domains.get(column)) or 'TRUE'
+
+        columns = ', '.join(FACET_COLUMNS)
+        grouping_sets = ', '.join('(%s)' % column for column in FACET_COLUMNS)
+        counts_sql = ', '.join(f'COUNT(*) FILTER (WHERE {matches(index)})' for index in range(len(FACET_COLUMNS)))
+        flags_sql = ''.join(f', {flag} AS matches_{column}' for flag, column in zip(flags, FACET_COLUMNS))
+        failed_sql = ' + '.join(f'(NOT matches_{column})::int' for column in FACET_COLUMNS
+                                if facet_domains.get(column)) or '0'
+        thresholds = [band[1] for band in PRICE_BANDS[1:]]
+        self.env.cr.execute(f"""
+            SELECT GROUPING({columns}), {columns}, COUNT(*) FILTER (WHERE {matches()}), {counts_sql}
+              FROM (
+                    SELECT "{table}".property_type_id,
+                           "{table}".location_id,
+                           "{table}".bedrooms,
+                           "{table}".bathrooms,
+                           "{table}".transaction_type,
+                           width_bucket("{table}".price, %s::numeric[]) AS price_band
+                           {flags_sql}
+                      FROM {from_clause}
+                     WHERE {where_clause or 'TRUE'}
+                   ) AS matching
+             WHERE {failed_sql} <= 1
+          GROUP BY GROUPING SETS ({grouping_sets}, ())
+        """, [thresholds] + flag_params + params)
+
+        width = len(FACET_COLUMNS)
+        total = 0
+        counts = {column: {} for column in FACET_COLUMNS}
+        for row in self.env.cr.fetchall():
+            grouping, values, total_count = row[0], row[1:width + 1], row[width + 1]
+            if grouping == (1 << width) - 1:
+                total = total_count
+                continue
+            # GROUPING() clears the bit of the column the row is grouped by
+            index = next(i for i in range(width) if not grouping & (1 << (width - 1 - i)))
+            count = row[width + 2 + index]
+            if count:
+                counts[FACET_COLUMNS[index]][values[index]] = count
+
+        facets = {
+            'property_type_id': counts['property_type_id'],
+            'location_id': counts['location_id'],
+            'transaction_type': counts['transaction_type'],
+            'price_band': {
+                PRICE_BANDS[bucket][0]: count
+                for bucket, count in counts['price_band'].items()
+                if bucket is not None
+            },
+        }
+        # Room filters are "N or more", so expose cumulative counts
+        for field_name in ('bedrooms', 'bathrooms'):
+            facets[field_name] = {
+                threshold: sum(count for value, count in counts[field_name].items()
+                               if value is not None and value >= threshold)
+                for threshold in ROOM_THRESHOLDS
+            }
+        return total, facets
+
+    @api.model
+    def _suggest(self, term, limit=SUGGEST_DEFAULT_LIMIT):
+        """Return typo tolerant suggestions across locations, cities, property
+        names and property codes, best matches first.
+        """
+        term = (term or '').strip()
+        if len(term) < SUGGEST_MIN_LENGTH:
+            return []
+        limit = max(1, min(limit or SUGGEST_DEFAULT_LIMIT, SUGGEST_MAX_LIMIT))
+        if not self.env.registry.has_trigram:
+            return self._suggest_prefix(term, limit)
+
+        property_name = "(jsonb_path_query_array(p.name, '$.*')::text)"
+        # Every branch is bounded and ordered by an index-backed KNN distance
+        self.env.cr.execute("SET LOCAL pg_trgm.word_similarity_threshold = %s",
+                            [SUGGEST_SIMILARITY_THRESHOLD])
+        self.env.cr.execute(f"""
+            (SELECT 'location', l.id, l.name, l.code, %(term)s <<-> l.name AS distance
+               FROM ghana_real_estate_location l
+              WHERE l.active AND %(term)s <%% l.name
+           ORDER BY %(term)s <<-> l.name
+              LIMIT %(limit)s)
+            UNION ALL
+            (SELECT 'city', c.id, c.name, NULL, %(term)s <<-> c.name
+               FROM ghana_real_estate_city c
+              WHERE c.active AND %(term)s <%% c.name
+           ORDER BY %(term)s <<-> c.name
+              LIMIT %(limit)s)
+            UNION ALL
+            (SELECT 'property', p.id, COALESCE(p.name->>%(lang)s, p.name->>'en_US'), p.property_code,
+                    %(term)s <<-> {property_name}
+               FROM ghana_real_estate_property p
+              WHERE p.active AND p.website_published AND p.state IN %(states)s
+                AND %(term)s <%% {property_name}
+           ORDER BY %(term)s <<-> {property_name}
+              LIMIT %(limit)s)
+            UNION ALL
+            (SELECT 'code', p.id, p.property_code, p.property_code, %(term)s <<-> p.property_code
+               FROM ghana_real_estate_property p
+              WHERE p.active AND p.website_published AND p.state IN %(states)s
+                AND %(term)s <%% p.property_code
+           ORDER BY %(term)s <<-> p.property_code
+              LIMIT %(limit)s)
+        """, {
+            'term': term,
+            'limit': limit,
+            'lang': self.env.lang or 'en_US',
+            'states': WEBSITE_STATES,
+        })
+        rows = sorted(self.env.cr.fetchall(), key=lambda row: row[4])
+        return [self._format_suggestion(*row[:4]) for row in rows[:limit]]
+
+    @api.model
+    def _suggest_prefix(self, term, limit):
+        """Plain prefix matching, used when pg_trgm is not available"""
+        suggestions = []
+        for location in self.env['ghana_real_estate.location'].search_read(
+                [('name', '=ilike', term + '%')], ['name', 'code'], limit=limit):
+            suggestions.append(self._format_suggestion(
+                'location', location['id'], location['name'], location['code']))
+        for city in self.env['ghana_real_estate.city'].search_read(
+                [('name', '=ilike', term + '%')], ['name'], limit=limit):
+            suggestions.append(self._format_suggestion('city', city['id'], city['name'], None))
+        for prop in self.env['ghana_real_estate.property'].search_read(
+                self._get_base_domain() + ['|', ('name', '=ilike', term + '%'),
+                                           ('property_code', '=ilike', term + '%')],
+                ['name', 'property_code'], limit=limit):
+            suggestions.append(self._format_suggestion(
+                'property', prop['id'], prop['name'], prop['property_code']))
+        return suggestions[:limit]
+
+    @api.model
+    def _format_suggestion(self, kind, record_id, label, code):
+        if kind == 'location':
+            url = f'/properties/location/{code}'
+        elif kind == 'city':
+            url = f'/properties?location={quote(label)}'
+        else:
+            url = f'/property/{record_id}'
+        return {
+            'type': kind,
+            'id': record_id,
+            'label': label,
+            'code': code,
+            'url': url,
+        }
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+import logging
+
+import numpy as np
+from psycopg2.extras import execute_values
+
+from odoo import models, fields, api
+from odoo.tools import split_every
+
+from .geo import EARTH_RADIUS_KM
+from .website_cache import WEBSITE_STATES
+
+_logger = logging.getLogger(__name__)
+
+# Neighbours stored per property
+SIMILARITY_TOP_N = 8
+
+# Properties scored against the whole catalogue at once, bounds the score matrix
+SIMILARITY_BATCH_SIZE = 32
+
+# Weight of each similarity dimension, summing to 1
+SIMILARITY_WEIGHTS = {
+    'type': 0.30,
+    'location': 0.20,
+    'price': 0.25,
+    'bedrooms': 0.15,
+    'distance': 0.10,
+}
+
+# Transaction types as integers, similar properties share the same one
+TRANSACTION_CODES = {'sale': 1, 'rent': 2, 'lease': 3}
+
+# Price ratio, bedroom difference and distance at which a dimension scores 0
+SIMILARITY_PRICE_RATIO = 2.0
+SIMILARITY_BEDROOM_SPAN = 3.0
+SIMILARITY_DISTANCE_KM = 10.0
+
+
+class GhanaRealEstatePropertySimilarity(models.Model):
+    """Precomputed similar properties, refreshed for changed listings"""
+
+    _name = 'ghana_real_estate.property.similarity'
+    _description = 'Similar Property'
+    _order = 'property_id, rank'
+    _log_access = False
+
+    property_id = fields.Many2one(
+        'ghana_real_estate.property',
+        string='Property',
+        required=True,
+        ondelete='cascade',
+        index=True
+    )
+
+    similar_id = fields.Many2one(
+        'ghana_real_estate.property',
+        string='Similar Property',
+        required=True,
+        ondelete='cascade',
+        index=True
+    )
+
+    rank = fields.Integer(
+        string='Rank'
+    )
+
+    score = fields.Float(
+        string='Score',
+        digits=(4, 3)
+    )
+
+    # Cron Jobs
+    @api.model
+    def _cron_refresh_similarities(self):
+        """Recompute the neighbours of the properties flagged as changed"""
+        cr = self.env.cr
+        self.env['ghana_real_estate.property'].flush_model(['similarity_dirty'])
+        cr.execute("SELECT id FROM ghana_real_estate_property WHERE similarity_dirty ORDER BY id")
+        dirty_ids = {row[0] for row in cr.fetchall()}
+        if not dirty_ids:
+            return
+        # Lists containing a changed property may rank it differently now
+        cr.execute("""
+            SELECT DISTINCT property_id
+              FROM ghana_real_estate_property_similarity
+             WHERE similar_id IN %s
+        """, [tuple(dirty_ids)])
+        dirty_ids.update(row[0] for row in cr.fetchall())
+
+        catalogue = self._load_catalogue()
+        thresholds = self._load_thresholds(catalogue)
+        entered = set()
+        for batch_ids in split_every(SIMILARITY_BATCH_SIZE, sorted(dirty_ids)):
+            entered.update(self._refresh_batch(list(batch_ids), catalogue, thresholds))
+            cr.commit()
+        # Lists a changed property now belongs to, scores are symmetric so the
+        # batches above already told which ones it would enter
+        entered.difference_update(dirty_ids)
+        for batch_ids in split_every(SIMILARITY_BATCH_SIZE, sorted(entered)):
+            self._refresh_batch(list(batch_ids), catalogue)
+            cr.commit()
+        self.invalidate_model()
+        self.env['ghana_real_estate.property'].invalidate_model(['similarity_dirty'])
+        _logger.info('Refreshed similar properties of %s properties, %s lists entered by them',
+                     len(dirty_ids), len(entered))
+
+    @api.model
+    def _load_catalogue(self):
+        """Load the features of every website property as column arrays"""
+        loaded_at = fields.Datetime.now()
+        self.env.cr.execute("""
+            SELECT id, COALESCE(property_type_id, 0), COALESCE(location_id, 0),
+                   transaction_type, price, COALESCE(bedrooms, 0),
+                   latitude, longitude
+              FROM ghana_real_estate_property
+             WHERE active AND website_published AND state IN %s AND price > 0
+          ORDER BY id
+        """, [WEBSITE_STATES])
+        rows = self.env.cr.fetchall()
+        columns = list(zip(*rows)) if rows else [()] * 8
+        latitude = np.array(columns[6], dtype=np.float64)
+        longitude = np.array(columns[7], dtype=np.float64)
+        return {
+            'loaded_at': loaded_at,
+            'ids': np.array(columns[0], dtype=np.int64),
+            'position': {record_id: index for index, record_id in enumerate(columns[0])},
+            'type': np.array(columns[1], dtype=np.int64),
+            'location': np.array(columns[2], dtype=np.int64),
+            'transaction': np.array([TRANSACTION_CODES.get(code, 0) for code in columns[3]], dtype=np.int64),
+            'log_price': np.log(np.array(columns[4], dtype=np.float64)),
+            'bedrooms': np.array(columns[5], dtype=np.float64),
+            # NULL coordinates arrive as NaN and score no distance similarity
+            'latitude': np.radians(latitude),
+            'longitude': np.radians(longitude),
+        }
+
+    @api.model
+    def _load_thresholds(self, catalogue):
+        """Score a property must beat to enter the stored list of each
+        catalogue property, -inf for lists that are not full.
+        """
+        thresholds = np.full(len(catalogue['ids']), -np.inf)
+        full = min(SIMILARITY_TOP_N, max(len(catalogue['ids']) - 1, 0))
+        self.env.cr.execute("""
+            SELECT property_id, COUNT(*), MIN(score)
+              FROM ghana_real_estate_property_similarity
+          GROUP BY property_id
+        """)
+        for property_id, count, min_score in self.env.cr.fetchall():
+            position = catalogue['position'].get(property_id)
+            if position is not None and count >= full:
+                thresholds[position] = min_score
+        return thresholds
+
+    @api.model
+    def _score(self, rows, catalogue):
+        """Return the (len(rows), catalogue size) matrix of similarity scores"""
+        def column(name):
+            return catalogue[name][rows][:, None]
+
+        weights = SIMILARITY_WEIGHTS
+        scores = weights['type'] * ((catalogue['type'] == column('type')) & (column('type') > 0))
+        scores += weights['location'] * ((catalogue['location'] == column('location')) & (column('location') > 0))
+        scores += weights['price'] * np.clip(
+            1 - np.abs(catalogue['log_price'] - column('log_price')) / np.log(SIMILARITY_PRICE_RATIO), 0, 1)
+        scores += weights['bedrooms'] * np.clip(
+            1 - np.abs(catalogue['bedrooms'] - column('bedrooms')) / SIMILARITY_BEDROOM_SPAN, 0, 1)
+
+        lat, lon = column('latitude'), column('longitude')
+        haversine = (np.sin((catalogue['latitude'] - lat) / 2) ** 2
+                     + np.cos(lat) * np.cos(catalogue['latitude'])
+                     * np.sin((catalogue['longitude'] - lon) / 2) ** 2)
+        distance = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(haversine, 0, 1)))
+        scores += weights['distance'] * np.nan_to_num(
+            np.clip(1 - distance / SIMILARITY_DISTANCE_KM, 0, 1), nan=0.0)
+
+        # Never suggest another transaction type or the property itself
+        scores[catalogue['transaction'] != column('transaction')] = -np.inf
+        scores[np.arange(len(rows)), rows] = -np.inf
+        return scores
+
+    @api.model
+    def _refresh_batch(self, property_ids, catalogue, thresholds=None):
+        """Store the neighbours of ``property_ids``. With ``thresholds``,
+        return the ids of the other properties whose list they would enter.
+        """
+        cr = self.env.cr
+        values = []
+        entered = set()
+        rows = [catalogue['position'][pid] for pid in property_ids if pid in catalogue['position']]
+        if rows and len(catalogue['ids']) > 1:
+            rows = np.array(rows)
+            scores = self._score(rows, catalogue)
+            if thresholds is not None:
+                better = np.isfinite(scores) & (scores > thresholds)
+                entered.update(int(record_id) for record_id in catalogue['ids'][better.any(axis=0)])
+            top_n = min(SIMILARITY_TOP_N, scores.shape[1] - 1)
+            candidates = np.argpartition(-scores, top_n - 1, axis=1)[:, :top_n]
+            for row, row_candidates in enumerate(candidates):
+                row_scores = scores[row, row_candidates]
+                rank = 0
+                for index in np.argsort(-row_scores):
+                    if not np.isfinite(row_scores[index]):
+                        break
+                    rank += 1
+                    values.append((
+                        int(catalogue['ids'][rows[row]]),
+                        int(catalogue['ids'][row_candidates[index]]),
+                        rank,
+                        round(float(row_scores[index]), 3),
+                    ))
+
+        # Properties no longer on the website simply lose their list
+        cr.execute("DELETE FROM ghana_real_estate_property_similarity WHERE property_id IN %s",
+                   [tuple(property_ids)])
+        if values:
+            execute_values(cr._obj, """
+                INSERT INTO ghana_real_estate_property_similarity (property_id, similar_id, rank, score)
+                VALUES %s
+            """, values)
+        # Records changed since the catalogue was loaded stay dirty for the next run
+        cr.execute("""
+            UPDATE ghana_real_estate_property
+               SET similarity_dirty = FALSE
+             WHERE id IN %s AND write_date <= %s
+        """, [tuple(property_ids), catalogue['loaded_at']])
+        return entered
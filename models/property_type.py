@@ -6,8 +6,10 @@ class GhanaRealEstatePropertyType(models.Model):
     
     _name = 'ghana_real_estate.property.type'
     _description = 'Property Type'
+    _inherit = ['ghana_real_estate.website.cache.mixin']
     _order = 'sequence, name'
     _rec_name = 'name'
+    _website_cache_fields = {'website_published', 'sequence', 'active'}
 
     name = fields.Char(
         string='Property Type Name',
@@ -49,10 +51,17 @@ class GhanaRealEstatePropertyType(models.Model):
         default=True
     )
     
+    property_ids = fields.One2many(
+        'ghana_real_estate.property',
+        'property_type_id',
+        string='Properties'
+    )
+    
     # Computed Fields
     property_count = fields.Integer(
         string='Number of Properties',
-        compute='_compute_property_count'
+        compute='_compute_property_count',
+        store=True
     )
     
     # For website display
@@ -84,14 +93,11 @@ class GhanaRealEstatePropertyType(models.Model):
         translate=True
     )
     
-    @api.depends('code')
+    @api.depends('property_ids.state', 'property_ids.website_published', 'property_ids.active')
     def _compute_property_count(self):
+        counts = self.env['ghana_real_estate.property']._read_website_counts('property_type_id', self)
         for record in self:
-            record.property_count = self.env['ghana_real_estate.property'].search_count([
-                ('property_type_id', '=', record.id),
-                ('website_published', '=', True),
-                ('state', 'in', ['available', 'draft'])
-            ])
+            record.property_count = counts.get(record._origin.id, 0)
     
     # SQL Constraints
     _sql_constraints = [
@@ -104,8 +110,10 @@ class GhanaRealEstateLocation(models.Model):
     
     _name = 'ghana_real_estate.location'
     _description = 'Location/Region'
+    _inherit = ['ghana_real_estate.website.cache.mixin']
     _order = 'name'
     _rec_name = 'name'
+    _website_cache_fields = {'sequence', 'active'}
 
     name = fields.Char(
         string='Region Name',
@@ -145,10 +153,17 @@ class GhanaRealEstateLocation(models.Model):
         default=True
     )
     
+    property_ids = fields.One2many(
+        'ghana_real_estate.property',
+        'location_id',
+        string='Properties'
+    )
+    
     # Computed Fields
     property_count = fields.Integer(
         string='Number of Properties',
-        compute='_compute_property_count'
+        compute='_compute_property_count',
+        store=True
     )
     
     # Related cities
@@ -158,14 +173,11 @@ class GhanaRealEstateLocation(models.Model):
         string='Cities'
     )
     
-    @api.depends('code')
+    @api.depends('property_ids.state', 'property_ids.website_published', 'property_ids.active')
     def _compute_property_count(self):
+        counts = self.env['ghana_real_estate.property']._read_website_counts('location_id', self)
         for record in self:
-            record.property_count = self.env['ghana_real_estate.property'].search_count([
-                ('location_id.code', '=', record.code),
-                ('website_published', '=', True),
-                ('state', 'in', ['available', 'draft'])
-            ])
+            record.property_count = counts.get(record._origin.id, 0)
     
     # SQL Constraints
     _sql_constraints = [
@@ -214,18 +226,28 @@ class GhanaRealEstateCity(models.Model):
         default=True
     )
     
-    # Computed Fields
+    # Computed Fields. Properties only point to a city by name, so the ORM
+    # cannot follow them: create, write (CITY_COUNTER_FIELDS) and unlink of
+    # properties call _mark_city_counters(), any other path changing those
+    # fields in SQL must call it too, or action_rebuild_property_counters()
     property_count = fields.Integer(
         string='Number of Properties',
-        compute='_compute_property_count'
+        compute='_compute_property_count',
+        store=True
     )
     
     @api.depends('name', 'region_id')
     def _compute_property_count(self):
+        Property = self.env['ghana_real_estate.property']
+        groups = Property.read_group(
+            Property._get_counter_domain() + [
+                ('location_id', 'in', self.region_id.ids),
+                ('city', 'in', [name for name in self.mapped('name') if name]),
+            ],
+            ['location_id'], ['location_id', 'city'], lazy=False)
+        counts = {
+            (group['location_id'][0], group['city']): group['__count']
+            for group in groups
+        }
         for record in self:
-            record.property_count = self.env['ghana_real_estate.property'].search_count([
-                ('city', '=', record.name),
-                ('location_id', '=', record.region_id.id),
-                ('website_published', '=', True),
-                ('state', 'in', ['available', 'draft'])
-            ])
+            record.property_count = counts.get((record.region_id.id, record.name), 0)
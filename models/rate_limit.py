@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+import threading
+import time
+
+from odoo import models, fields, api
+
+# Token bucket defaults, overridable with ir.config_parameter
+RATE_LIMIT_CAPACITY = 5
+RATE_LIMIT_REFILL_PER_MINUTE = 2.0
+
+# Bounds of the per-worker stores
+RATE_LIMIT_MAX_KEYS = 50000
+FINGERPRINT_TTL = 60
+FINGERPRINT_MAX_ENTRIES = 20000
+
+# Form fields ignored when fingerprinting a submission
+FINGERPRINT_IGNORED_FIELDS = {'csrf_token'}
+
+
+class MemoryTokenBuckets:
+    """Per-worker token buckets as {key: (tokens, last refill time)}"""
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def consume(self, keys, capacity, rate):
+        """Take one token from every bucket, False if one of them is empty"""
+        now = time.monotonic()
+        with self._lock:
+            if len(self._buckets) > self.max_keys:
+                self._prune(now, capacity, rate)
+            levels = {}
+            for key in keys:
+                tokens, updated = self._buckets.get(key, (capacity, now))
+                levels[key] = min(capacity, tokens + (now - updated) * rate)
+            allowed = all(tokens >= 1 for tokens in levels.values())
+            for key, tokens in levels.items():
+                self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+            return allowed
+
+    def _prune(self, now, capacity, rate):
+        # Buckets refilled to capacity are equivalent to missing ones
+        self._buckets = {
+            key: (tokens, updated) for key, (tokens, updated) in self._buckets.items()
+            if tokens + (now - updated) * rate < capacity
+        }
+
+
+class FingerprintCache:
+    """Per-worker set of recent submission fingerprints"""
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def check_and_add(self, fingerprint):
+        """Return True if the fingerprint was seen within the TTL"""
+        now = time.monotonic()
+        with self._lock:
+            seen_at = self._seen.get(fingerprint)
+            if seen_at is not None and now - seen_at < self.ttl:
+                return True
+            if len(self._seen) >= self.max_entries:
+                self._seen = {key: at for key, at in self._seen.items() if now - at < self.ttl}
+            self._seen[fingerprint] = now
+            return False
+
+
+MEMORY_BUCKETS = MemoryTokenBuckets(RATE_LIMIT_MAX_KEYS)
+FINGERPRINTS = FingerprintCache(FINGERPRINT_TTL, FINGERPRINT_MAX_ENTRIES)
+
+
+class GhanaRealEstateRateLimit(models.Model):
+    """Token buckets shared by all workers, used with the database store"""
+
+    _name = 'ghana_real_estate.rate.limit'
+    _description = 'Rate Limit Bucket'
+    _log_access = False
+
+    key = fields.Char(
+        string='Key',
+        required=True
+    )
+
+    tokens = fields.Float(
+        string='Tokens'
+    )
+
+    updated_at = fields.Float(
+        string='Updated At',
+        help='Epoch of the last refill'
+    )
+
+    _sql_constraints = [
+        ('unique_key', 'UNIQUE(key)', 'Rate limit keys must be unique!'),
+    ]
+
+    @api.model
+    def _get_bucket_params(self):
+        """Return the (capacity, refill per second) of the buckets"""
+        get_param = self.env['ir.config_parameter'].sudo().get_param
+        capacity = float(get_param('ghana_real_estate.rate_limit_capacity', RATE_LIMIT_CAPACITY))
+        rate = float(get_param('ghana_real_estate.rate_limit_refill_per_minute',
+                               RATE_LIMIT_REFILL_PER_MINUTE)) / 60
+        return capacity, rate
+
+    @api.model
+    def _consume(self, keys):
+        """Take one token from the bucket of every key, False when throttled.
+
+        The store is chosen with the "ghana_real_estate.rate_limit_store"
+        system parameter: "memory" (default, per worker) or "database".
+        """
+        capacity, rate = self._get_bucket_params()
+        store = self.env['ir.config_parameter'].sudo().get_param('ghana_real_estate.rate_limit_store', 'memory')
+        if store != 'database':
+            return MEMORY_BUCKETS.consume(keys, capacity, rate)
+
+        # Missing buckets start full, then every bucket is locked and only
+        # decremented when all of them hold a token, like the memory store
+        keys = sorted(set(keys))
+        if not keys:
+            return True
+        params = {'keys': keys, 'capacity': capacity, 'rate': rate, 'now': time.time()}
+        self.env.cr.execute("""
+            INSERT INTO ghana_real_estate_rate_limit (key, tokens, updated_at)
+            SELECT unnest(%(keys)s::varchar[]), %(capacity)s, %(now)s
+            ON CONFLICT (key) DO NOTHING
+        """, params)
+        self.env.cr.execute("""
+            WITH levels AS (
+                SELECT id, LEAST(%(capacity)s, tokens + (%(now)s - updated_at) * %(rate)s) AS tokens
+                  FROM ghana_real_estate_rate_limit
+                 WHERE key = ANY(%(keys)s::varchar[])
+              ORDER BY key
+                   FOR UPDATE
+            ), decision AS (
+                SELECT bool_and(tokens >= 1) AS allowed FROM levels
+            )
+            UPDATE ghana_real_estate_rate_limit AS bucket
+               SET tokens = levels.tokens - CASE WHEN decision.allowed THEN 1 ELSE 0 END,
+                   updated_at = %(now)s
+              FROM levels, decision
+             WHERE bucket.id = levels.id
+         RETURNING decision.allowed
+        """, params)
+        # No row left only when the autovacuum dropped the full buckets
+        row = self.env.cr.fetchone()
+        return row[0] if row else True
+
+    @api.model
+    def _is_duplicate_submission(self, route, post):
+        """True if the same form data was posted to the route moments ago"""
+        payload = json.dumps(
+            [route, sorted((key, str(value)) for key, value in post.items()
+                           if key not in FINGERPRINT_IGNORED_FIELDS)],
+            separators=(',', ':'))
+        return FINGERPRINTS.check_and_add(hashlib.sha1(payload.encode()).hexdigest())
+
+    @api.autovacuum
+    def _gc_buckets(self):
+        """Drop the database buckets that have been refilled to capacity"""
+        capacity, rate = self._get_bucket_params()
+        self.env.cr.execute("""
+            DELETE FROM ghana_real_estate_rate_limit
+             WHERE tokens + (%s - updated_at) * %s >= %s
+        """, [time.time(), rate, capacity])
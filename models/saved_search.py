@@ -0,0 +1,374 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from odoo import models, fields, api, _
+from odoo.tools.safe_eval import safe_eval
+
+from .syndication import SYNDICATION_OVERLAP_MINUTES
+from .utils import to_float, to_int
+from .website_cache import WEBSITE_STATES
+
+_logger = logging.getLogger(__name__)
+
+# Filters a saved search keeps, the other request parameters are dropped
+SAVED_SEARCH_FILTERS = [
+    'transaction_type', 'property_type', 'property_type_id', 'location_id',
+    'location_code', 'location', 'search', 'min_price', 'max_price',
+    'price_range', 'bedrooms', 'bathrooms', 'near', 'radius', 'within_bbox',
+]
+
+# Filters only the compiled domain can check, see needs_verification
+RESIDUAL_FILTERS = {'location', 'search', 'near', 'within_bbox'}
+
+# Properties listed per saved search in a digest
+DIGEST_MAX_PROPERTIES = 10
+
+SAVED_SEARCH_JOB = 'saved_search_matching'
+
+# Join conditions of the saved searches keyed on both, one or none of the
+# location and the property type of a property
+MATCH_KEY_CONDITIONS = [
+    ('s.location_id = p.location_id', 's.property_type_id = p.property_type_id'),
+    ('s.location_id = p.location_id', 's.property_type_id IS NULL'),
+    ('s.location_id IS NULL', 's.property_type_id = p.property_type_id'),
+    ('s.location_id IS NULL', 's.property_type_id IS NULL'),
+]
+
+
+class GhanaRealEstateSavedSearch(models.Model):
+    """Property search saved by a website user, with new listing alerts"""
+
+    _name = 'ghana_real_estate.saved.search'
+    _description = 'Saved Property Search'
+    _order = 'create_date desc'
+
+    name = fields.Char(
+        string='Name',
+        required=True
+    )
+
+    user_id = fields.Many2one(
+        'res.users',
+        string='User',
+        required=True,
+        default=lambda self: self.env.user,
+        ondelete='cascade',
+        index=True
+    )
+
+    active = fields.Boolean(
+        string='Active',
+        default=True
+    )
+
+    filters = fields.Text(
+        string='Filters',
+        help='Normalized JSON of the search filters'
+    )
+
+    # Compiled dimensions, joined against changed properties by the matcher
+    domain = fields.Text(
+        string='Compiled Domain',
+        readonly=True
+    )
+
+    transaction_type = fields.Char(
+        string='Transaction Type',
+        readonly=True
+    )
+
+    property_type_id = fields.Many2one(
+        'ghana_real_estate.property.type',
+        string='Property Type',
+        readonly=True,
+        ondelete='cascade'
+    )
+
+    location_id = fields.Many2one(
+        'ghana_real_estate.location',
+        string='Location',
+        readonly=True,
+        ondelete='cascade'
+    )
+
+    min_price = fields.Float(
+        string='Min Price',
+        readonly=True
+    )
+
+    max_price = fields.Float(
+        string='Max Price',
+        readonly=True
+    )
+
+    min_bedrooms = fields.Integer(
+        string='Min Bedrooms',
+        readonly=True
+    )
+
+    min_bathrooms = fields.Integer(
+        string='Min Bathrooms',
+        readonly=True
+    )
+
+    needs_verification = fields.Boolean(
+        string='Needs Domain Check',
+        readonly=True,
+        help='Set when some filters (text, geographic) are not compiled into dimensions'
+    )
+
+    match_ids = fields.One2many(
+        'ghana_real_estate.saved.search.match',
+        'search_id',
+        string='Matches'
+    )
+
+    last_digest_at = fields.Datetime(
+        string='Last Digest',
+        readonly=True
+    )
+
+    def init(self):
+        # Inverted index of the matcher: candidate searches per location and type
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS ghana_real_estate_saved_search_dimensions_idx
+                ON ghana_real_estate_saved_search (location_id, property_type_id)
+             WHERE active
+        """)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        vals_list = [self._compile_vals(vals) for vals in vals_list]
+        return super().create(vals_list)
+
+    def write(self, vals):
+        return super().write(self._compile_vals(vals))
+
+    @api.model
+    def _compile_vals(self, vals):
+        """Normalize the filters of ``vals`` and add their compiled dimensions"""
+        if 'filters' not in vals:
+            return vals
+        raw = vals['filters'] or {}
+        if isinstance(raw, str):
+            raw = json.loads(raw or '{}')
+        filters = {key: str(raw[key]) for key in SAVED_SEARCH_FILTERS
+                   if raw.get(key) not in (None, '', 'any')}
+        vals = dict(vals, filters=json.dumps(filters, sort_keys=True))
+        vals.update(self._compile_filters(filters))
+        return vals
+
+    @api.model
+    def _compile_filters(self, filters):
+        """Translate filters into indexed dimensions and a verification domain"""
+        engine = self.env['ghana_real_estate.property.search']
+        property_type_id = to_int(filters.get('property_type_id'))
+        property_type = filters.get('property_type')
+        if not property_type_id and property_type:
+            if property_type.isdigit():
+                property_type_id = int(property_type)
+            else:
+                property_type_id = self.env['ghana_real_estate.property.type'].search(
+                    [('code', '=', property_type)], limit=1).id
+        location_id = to_int(filters.get('location_id'))
+        if not location_id and filters.get('location_code'):
+            location_id = self.env['ghana_real_estate.location'].search(
+                [('code', '=', filters['location_code'])], limit=1).id
+
+        min_price = to_float(filters.get('min_price'))
+        max_price = to_float(filters.get('max_price'))
+        price_range = filters.get('price_range')
+        if price_range and '-' in price_range:
+            low, high = price_range.split('-', 1)
+            min_price = to_float(low) if min_price is None else min_price
+            max_price = to_float(high) if max_price is None else max_price
+
+        return {
+            'domain': repr(engine._build_domain(filters)),
+            'transaction_type': filters.get('transaction_type') or False,
+            'property_type_id': property_type_id or False,
+            'location_id': location_id or False,
+            'min_price': min_price or 0.0,
+            'max_price': max_price or 0.0,
+            'min_bedrooms': to_int(filters.get('bedrooms')) or 0,
+            'min_bathrooms': to_int(filters.get('bathrooms')) or 0,
+            # Unknown codes leave a dimension open, the domain still rejects them
+            'needs_verification': bool(RESIDUAL_FILTERS.intersection(filters))
+                                  or bool(property_type and not property_type_id)
+                                  or bool(filters.get('location_code') and not location_id),
+        }
+
+    # Cron Jobs
+    @api.model
+    def _cron_match_properties(self):
+        """Match the properties changed since the last run against every
+        saved search and record the new matches.
+
+        The first run only sets the watermark, the existing catalogue is
+        never sent as new. Later runs read again the overlap window of the
+        syndication feeds before it, for rows committed after the previous
+        run started; matches already recorded are skipped by _record().
+        """
+        JobRun = self.env['ghana_real_estate.job.run']
+        watermark = JobRun._get_last_run(SAVED_SEARCH_JOB).started_at
+        run = JobRun._start(SAVED_SEARCH_JOB)
+        self.env.cr.commit()
+        if not watermark:
+            run._finish('done', 0, {'properties': 0, 'matches': 0}, 'Watermark initialized')
+            self.env.cr.commit()
+            return
+
+        overlap = int(self.env['ir.config_parameter'].sudo().get_param(
+            'ghana_real_estate.syndication_overlap_minutes', SYNDICATION_OVERLAP_MINUTES))
+        Property = self.env['ghana_real_estate.property']
+        property_ids = Property.search([
+            ('website_published', '=', True),
+            ('state', 'in', list(WEBSITE_STATES)),
+            ('write_date', '>', watermark - timedelta(minutes=overlap)),
+        ]).ids
+        created = self._match_properties(property_ids) if property_ids else 0
+        run._finish('done', len(property_ids), {'properties': len(property_ids), 'matches': created})
+        self.env.cr.commit()
+
+    @api.model
+    def _match_properties(self, property_ids):
+        """Record the saved searches matching ``property_ids``, return the
+        number of new matches.
+        """
+        self.flush_model()
+        self.env['ghana_real_estate.property'].flush_model()
+        # Inverted index lookup: one join per (location, type) key shape, each
+        # driven by the (location_id, property_type_id) index of the searches
+        # instead of an OR that would compare every search with every property
+        branches = ' UNION ALL '.join(f"""
+            SELECT s.id, p.id, s.needs_verification
+              FROM changed p
+              JOIN ghana_real_estate_saved_search s
+                ON s.active
+               AND {location_condition}
+               AND {type_condition}
+               AND (s.transaction_type IS NULL OR s.transaction_type = p.transaction_type)
+               AND (COALESCE(s.min_price, 0) = 0 OR p.price >= s.min_price)
+               AND (COALESCE(s.max_price, 0) = 0 OR p.price <= s.max_price)
+               AND (COALESCE(s.min_bedrooms, 0) = 0 OR p.bedrooms >= s.min_bedrooms)
+               AND (COALESCE(s.min_bathrooms, 0) = 0 OR p.bathrooms >= s.min_bathrooms)
+        """ for location_condition, type_condition in MATCH_KEY_CONDITIONS)
+        self.env.cr.execute(f"""
+            WITH changed AS (
+                SELECT id, location_id, property_type_id, transaction_type, price, bedrooms, bathrooms
+                  FROM ghana_real_estate_property
+                 WHERE id IN %s
+            )
+            {branches}
+        """, [tuple(property_ids)])
+        pairs = []
+        to_verify = defaultdict(list)
+        for search_id, property_id, needs_verification in self.env.cr.fetchall():
+            if needs_verification:
+                to_verify[search_id].append(property_id)
+            else:
+                pairs.append((search_id, property_id))
+
+        # Text and geographic filters: one domain check per search and batch
+        Property = self.env['ghana_real_estate.property']
+        for search in self.browse(list(to_verify)):
+            candidates = to_verify[search.id]
+            matching = Property.search(safe_eval(search.domain) + [('id', 'in', candidates)])
+            pairs.extend((search.id, property_id) for property_id in matching.ids)
+
+        if not pairs:
+            return 0
+        return self.env['ghana_real_estate.saved.search.match']._record(pairs)
+
+    @api.model
+    def _cron_send_digests(self):
+        """Email each user one digest of the new matches of all their searches"""
+        Match = self.env['ghana_real_estate.saved.search.match']
+        pending = Match.search([('notified', '=', False)], order='search_id, id')
+        by_user = defaultdict(lambda: defaultdict(lambda: Match))
+        for match in pending:
+            if match.search_id.active and match.property_id.website_published:
+                by_user[match.search_id.user_id][match.search_id] |= match
+
+        mails = []
+        for user, searches in by_user.items():
+            if not user.email:
+                continue
+            sections = [{
+                'search': search,
+                'properties': matches.property_id[:DIGEST_MAX_PROPERTIES],
+                'count': len(matches),
+            } for search, matches in searches.items()]
+            body = self.env['ir.qweb'].with_context(lang=user.lang)._render(
+                'ghana_real_estate.saved_search_digest', {
+                    'user': user,
+                    'sections': sections,
+                    'base_url': self.get_base_url(),
+                })
+            mails.append({
+                'subject': _('New properties matching your saved searches'),
+                'email_to': user.email_formatted,
+                'body_html': body,
+                'auto_delete': True,
+            })
+        if mails:
+            self.env['mail.mail'].sudo().create(mails)
+        pending.write({'notified': True})
+        self.browse({search.id for searches in by_user.values() for search in searches}).write({
+            'last_digest_at': fields.Datetime.now(),
+        })
+        _logger.info('Sent %s saved search digests', len(mails))
+
+
+class GhanaRealEstateSavedSearchMatch(models.Model):
+    """Property matched by a saved search, waiting for or sent in a digest"""
+
+    _name = 'ghana_real_estate.saved.search.match'
+    _description = 'Saved Search Match'
+    _order = 'id desc'
+
+    search_id = fields.Many2one(
+        'ghana_real_estate.saved.search',
+        string='Saved Search',
+        required=True,
+        ondelete='cascade',
+        index=True
+    )
+
+    property_id = fields.Many2one(
+        'ghana_real_estate.property',
+        string='Property',
+        required=True,
+        ondelete='cascade'
+    )
+
+    notified = fields.Boolean(
+        string='Notified',
+        default=False,
+        index=True
+    )
+
+    _sql_constraints = [
+        ('unique_search_property', 'UNIQUE(search_id, property_id)',
+         'A property matches a saved search only once!'),
+    ]
+
+    @api.model
+    def _record(self, pairs):
+        """Insert the (search id, property id) pairs not matched before"""
+        self.env.cr.execute("""
+            INSERT INTO ghana_real_estate_saved_search_match
+                   (search_id, property_id, notified, create_uid, create_date, write_uid, write_date)
+            SELECT pair.search_id, pair.property_id, FALSE, %(uid)s, NOW() AT TIME ZONE 'UTC',
+                   %(uid)s, NOW() AT TIME ZONE 'UTC'
+              FROM unnest(%(search_ids)s::int[], %(property_ids)s::int[]) AS pair(search_id, property_id)
+            ON CONFLICT (search_id, property_id) DO NOTHING
+        """, {
+            'uid': self.env.uid,
+            'search_ids': [pair[0] for pair in pairs],
+            'property_ids': [pair[1] for pair in pairs],
+        })
+        return self.env.cr.rowcount
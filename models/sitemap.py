@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+import base64
+import gzip
+import io
+import logging
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+from odoo import models, fields, api
+
+from .website_cache import WEBSITE_STATES
+
+_logger = logging.getLogger(__name__)
+
+# Protocol limit of URLs per sitemap file
+SITEMAP_MAX_URLS = 50000
+
+# Rows fetched per query while writing a shard
+SITEMAP_CHUNK_SIZE = 2000
+
+SITEMAP_JOB = 'sitemap'
+
+# Published pages per kind as (table, condition, condition params, path SQL),
+# the conditions mirror the checks of the matching website routes
+SITEMAP_SOURCES = {
+    'property': ('ghana_real_estate_property',
+                 'active AND website_published AND state IN %s', [WEBSITE_STATES],
+                 "'/property/' || id"),
+    'agent': ('ghana_real_estate_agent',
+              'active AND website_published', [],
+              "'/agent/' || id"),
+    'type': ('ghana_real_estate_property_type',
+             'active AND code IS NOT NULL', [],
+             "'/properties/type/' || code"),
+    'location': ('ghana_real_estate_location',
+                 'active AND code IS NOT NULL', [],
+                 "'/properties/location/' || code"),
+}
+
+SITEMAP_HEADER = b'<?xml version="1.0" encoding="UTF-8"?>\n' \
+                 b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+SITEMAP_FOOTER = b'</urlset>\n'
+
+
+class GhanaRealEstateSitemapShard(models.Model):
+    """Gzipped sitemap file covering a range of published records"""
+
+    _name = 'ghana_real_estate.sitemap.shard'
+    _description = 'Sitemap Shard'
+    _order = 'kind, sequence'
+
+    kind = fields.Selection([
+        ('property', 'Properties'),
+        ('agent', 'Agents'),
+        ('type', 'Property Types'),
+        ('location', 'Locations'),
+    ], string='Kind',
+       required=True
+    )
+
+    sequence = fields.Integer(
+        string='Sequence',
+        required=True
+    )
+
+    first_id = fields.Integer(
+        string='First Record ID'
+    )
+
+    last_id = fields.Integer(
+        string='Last Record ID'
+    )
+
+    url_count = fields.Integer(
+        string='URLs'
+    )
+
+    signature = fields.Char(
+        string='Signature',
+        help='Hash of the ids, paths and write dates of the records of the shard'
+    )
+
+    lastmod = fields.Datetime(
+        string='Last Modified'
+    )
+
+    attachment_id = fields.Many2one(
+        'ir.attachment',
+        string='File',
+        ondelete='set null'
+    )
+
+    _sql_constraints = [
+        ('unique_kind_sequence', 'UNIQUE(kind, sequence)', 'Sitemap shards must be unique per kind!'),
+    ]
+
+    @api.model
+    def _get_shard_signatures(self, kind):
+        """Describe the shards a kind needs now, without reading the records.
+
+        Shard N holds the published records with ids from N * SITEMAP_MAX_URLS
+        to (N + 1) * SITEMAP_MAX_URLS - 1: a range that can never hold more
+        URLs than allowed, and that does not move when other records are
+        published or removed. Each shard is summarized by its size, latest
+        write and an md5 of its content, and is only rewritten when that
+        signature changed.
+        """
+        table, where, params, path = SITEMAP_SOURCES[kind]
+        self.env.cr.execute(f"""
+            SELECT id / %s AS sequence, MIN(id), MAX(id), COUNT(*), MAX(write_date),
+                   md5(string_agg(id || ':' || {path} || ':' || COALESCE(write_date::text, ''), ',' ORDER BY id))
+              FROM {table}
+             WHERE {where}
+          GROUP BY 1
+          ORDER BY 1
+        """, [SITEMAP_MAX_URLS] + params)
+        return [{
+            'sequence': sequence,
+            'first_id': first_id,
+            'last_id': last_id,
+            'url_count': count,
+            'lastmod': lastmod,
+            'signature': signature,
+        } for sequence, first_id, last_id, count, lastmod, signature in self.env.cr.fetchall()]
+
+    @api.model
+    def _write_shard(self, kind, first_id, last_id, base_url):
+        """Stream the URLs of ids ``first_id`` to ``last_id`` into gzip bytes,
+        fetching SITEMAP_CHUNK_SIZE rows at a time.
+        """
+        table, where, params, path = SITEMAP_SOURCES[kind]
+        buffer = io.BytesIO()
+        with gzip.GzipFile(fileobj=buffer, mode='wb', mtime=0) as stream:
+            stream.write(SITEMAP_HEADER)
+            last_seen = first_id - 1
+            while True:
+                self.env.cr.execute(f"""
+                    SELECT id, {path}, write_date
+                      FROM {table}
+                     WHERE {where} AND id > %s AND id <= %s
+                  ORDER BY id
+                     LIMIT %s
+                """, params + [last_seen, last_id, SITEMAP_CHUNK_SIZE])
+                rows = self.env.cr.fetchall()
+                if not rows:
+                    break
+                stream.write(''.join(
+                    '<url><loc>%s</loc>%s</url>\n' % (
+                        escape(base_url + quote(url_path)),
+                        f'<lastmod>{write_date.date().isoformat()}</lastmod>' if write_date else '')
+                    for _id, url_path, write_date in rows
+                ).encode())
+                last_seen = rows[-1][0]
+            stream.write(SITEMAP_FOOTER)
+        return buffer.getvalue()
+
+    # Cron Jobs
+    @api.model
+    def _cron_generate_sitemaps(self):
+        """Rewrite the shards whose records changed, drop the extra ones"""
+        run = self.env['ghana_real_estate.job.run']._start(SITEMAP_JOB)
+        self.env.cr.commit()
+        base_url = self.get_base_url()
+        Attachment = self.env['ir.attachment'].sudo()
+        stats = {'written': 0, 'unchanged': 0, 'removed': 0, 'urls': 0}
+
+        for kind in SITEMAP_SOURCES:
+            existing = {shard.sequence: shard for shard in self.search([('kind', '=', kind)])}
+            for vals in self._get_shard_signatures(kind):
+                stats['urls'] += vals['url_count']
+                # The base URL is part of every <loc>
+                vals['signature'] = f"{vals['signature']}:{base_url}"
+                shard = existing.pop(vals['sequence'], None)
+                if shard and shard.signature == vals['signature'] and shard.attachment_id:
+                    stats['unchanged'] += 1
+                    continue
+                content = self._write_shard(kind, vals['first_id'], vals['last_id'], base_url)
+                attachment_vals = {
+                    'name': f"sitemap-{kind}-{vals['sequence']}.xml.gz",
+                    'datas': base64.b64encode(content),
+                    'mimetype': 'application/gzip',
+                    'res_model': self._name,
+                }
+                if shard and shard.attachment_id:
+                    shard.attachment_id.write(attachment_vals)
+                    shard.write(vals)
+                else:
+                    shard = shard or self.create(dict(vals, kind=kind))
+                    attachment_vals['res_id'] = shard.id
+                    shard.write(dict(vals, attachment_id=Attachment.create(attachment_vals).id))
+                stats['written'] += 1
+                self.env.cr.commit()
+
+            # Id ranges left without any published record
+            obsolete = self.browse([shard.id for shard in existing.values()])
+            if obsolete:
+                stats['removed'] += len(obsolete)
+                obsolete.attachment_id.unlink()
+                obsolete.unlink()
+                self.env.cr.commit()
+
+        run._finish('done', stats['written'], stats)
+        self.env.cr.commit()
+        _logger.info('Sitemap: %(written)s shards written, %(unchanged)s unchanged, %(removed)s removed', stats)
+
+    @api.model
+    def _get_index_xml(self, base_url):
+        """Sitemap index listing every shard"""
+        entries = ''.join(
+            '<sitemap><loc>%s</loc>%s</sitemap>\n' % (
+                escape(f'{base_url}/sitemap-real-estate-{shard.kind}-{shard.sequence}.xml.gz'),
+                f'<lastmod>{shard.lastmod.date().isoformat()}</lastmod>' if shard.lastmod else '')
+            for shard in self.search([('attachment_id', '!=', False)])
+        )
+        return ('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+                f'{entries}</sitemapindex>\n')
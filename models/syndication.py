@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+import json
+import secrets
+from datetime import timedelta
+from xml.sax.saxutils import escape, quoteattr
+
+from odoo import models, fields, api, SUPERUSER_ID
+
+from .website_cache import WEBSITE_STATES
+
+# Properties serialized per query, bounds the memory of a feed
+SYNDICATION_CHUNK_SIZE = 200
+
+# write_date is the start of the writing transaction, a row may commit long
+# after it: deltas read again this far before their "since", overridable with
+# the "ghana_real_estate.syndication_overlap_minutes" system parameter
+SYNDICATION_OVERLAP_MINUTES = 120
+
+# Deletions kept for partners pulling deltas
+SYNDICATION_DELETION_RETENTION = timedelta(days=90)
+
+# Property data sent to the portals, see _get_api_data()
+SYNDICATION_FIELDS = [
+    'property_code', 'name', 'description', 'transaction_type', 'state', 'price',
+    'display_price', 'property_type', 'location', 'city', 'address', 'latitude',
+    'longitude', 'bedrooms', 'bathrooms', 'land_size', 'building_size', 'furnished',
+    'features', 'images', 'agent', 'url',
+]
+
+# Keys holding website paths, made absolute in the feeds
+SYNDICATION_URL_KEYS = {'url', 'image_url', 'thumbnail_url', 'photo_url'}
+
+# Element of each list item in the XML feed
+SYNDICATION_XML_ITEMS = {'images': 'image', 'features': 'feature'}
+
+
+class GhanaRealEstateSyndicationPartner(models.Model):
+    """External property portal pulling the listing feed"""
+
+    _name = 'ghana_real_estate.syndication.partner'
+    _description = 'Syndication Partner'
+    _order = 'name'
+
+    name = fields.Char(
+        string='Portal',
+        required=True
+    )
+
+    access_token = fields.Char(
+        string='Access Token',
+        required=True,
+        copy=False,
+        default=lambda self: secrets.token_urlsafe(32)
+    )
+
+    active = fields.Boolean(
+        string='Active',
+        default=True
+    )
+
+    last_pull_at = fields.Datetime(
+        string='Last Pull',
+        readonly=True
+    )
+
+    last_watermark = fields.Datetime(
+        string='Last Watermark',
+        readonly=True,
+        help='End of the window of the last feed, to pass as "since" for the next delta'
+    )
+
+    _sql_constraints = [
+        ('unique_access_token', 'UNIQUE(access_token)', 'Access tokens must be unique!'),
+    ]
+
+    @api.model
+    def _authenticate(self, token):
+        if not token:
+            return self.browse()
+        return self.sudo().search([('access_token', '=', token)], limit=1)
+
+    def _open_feed(self, feed_format, since=None):
+        """Log the pull and return (watermark, chunk generator) of a feed.
+
+        Without ``since`` the feed is a full dump of the published listings,
+        otherwise a delta of the listings written after ``since`` followed by
+        tombstones for those unpublished, sold, rented, archived or deleted.
+        Deltas start an overlap window before ``since`` so that rows
+        committed by long transactions are not missed; rows already sent
+        come again with the same (id, updated_at) and partners skip them.
+        """
+        self.ensure_one()
+        until = fields.Datetime.now()
+        self.sudo().write({'last_pull_at': until, 'last_watermark': until})
+        if since:
+            overlap = int(self.env['ir.config_parameter'].sudo().get_param(
+                'ghana_real_estate.syndication_overlap_minutes', SYNDICATION_OVERLAP_MINUTES))
+            since -= timedelta(minutes=overlap)
+        writer = _JsonLinesWriter() if feed_format == 'jsonl' else _XmlWriter()
+        stream = self._stream_feed(self.env.registry, writer, self.get_base_url(), since, until)
+        return until, stream
+
+    @api.model
+    def _stream_feed(self, registry, writer, base_url, since, until):
+        # The response is sent after the request cursor is closed, the feed
+        # reads from its own: one repeatable read snapshot for every chunk
+        with registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            Property = env['ghana_real_estate.property']
+            mode = 'delta' if since else 'full'
+            yield writer.start(mode, since, until)
+
+            domain = env['ghana_real_estate.property.search']._get_base_domain()
+            window = [('write_date', '<=', until)]
+            if since:
+                window.append(('write_date', '>', since))
+            last_id = 0
+            while True:
+                properties = Property.search(domain + window + [('id', '>', last_id)],
+                                             order='id', limit=SYNDICATION_CHUNK_SIZE)
+                if not properties:
+                    break
+                last_id = properties.ids[-1]
+                updated = dict(zip(properties.ids, properties.mapped('write_date')))
+                chunk = []
+                for data in properties._get_api_data(SYNDICATION_FIELDS):
+                    data['updated_at'] = updated[data['id']]
+                    chunk.append(writer.listing(_absolutize(data, base_url)))
+                yield ''.join(chunk)
+                # Only the current chunk is ever held in the cache
+                env.invalidate_all()
+
+            if since:
+                for tombstones in self._iter_tombstones(env, window, until, since):
+                    yield ''.join(writer.tombstone(tombstone) for tombstone in tombstones)
+            yield writer.end()
+
+    @api.model
+    def _iter_tombstones(self, env, window, until, since):
+        """Chunks of the listings that left the feed within the window"""
+        Property = env['ghana_real_estate.property'].with_context(active_test=False)
+        gone = ['|', '|', ('active', '=', False), ('website_published', '=', False),
+                ('state', 'not in', list(WEBSITE_STATES))]
+        last_id = 0
+        while True:
+            rows = Property.search_read(gone + window + [('id', '>', last_id)],
+                                        ['property_code', 'active', 'website_published', 'state', 'write_date'],
+                                        order='id', limit=SYNDICATION_CHUNK_SIZE)
+            if not rows:
+                break
+            last_id = rows[-1]['id']
+            yield [{
+                'id': row['id'],
+                'property_code': row['property_code'],
+                'reason': (row['state'] if row['state'] not in WEBSITE_STATES
+                           else 'archived' if not row['active'] else 'unpublished'),
+                'updated_at': row['write_date'],
+            } for row in rows]
+            env.invalidate_all()
+
+        deletions = env['ghana_real_estate.syndication.deletion'].search_read(
+            [('deleted_at', '>', since), ('deleted_at', '<=', until)],
+            ['property_id', 'property_code', 'deleted_at'], order='id')
+        if deletions:
+            yield [{
+                'id': row['property_id'],
+                'property_code': row['property_code'],
+                'reason': 'deleted',
+                'updated_at': row['deleted_at'],
+            } for row in deletions]
+
+
+class GhanaRealEstateSyndicationDeletion(models.Model):
+    """Deleted property, reported as a tombstone in delta feeds"""
+
+    _name = 'ghana_real_estate.syndication.deletion'
+    _description = 'Deleted Property Log'
+    _order = 'id'
+    _log_access = False
+
+    property_id = fields.Integer(
+        string='Property ID',
+        required=True
+    )
+
+    property_code = fields.Char(
+        string='Property Code'
+    )
+
+    deleted_at = fields.Datetime(
+        string='Deleted At',
+        required=True,
+        index=True
+    )
+
+    @api.model
+    def _record(self, properties):
+        now = fields.Datetime.now()
+        self.sudo().create([{
+            'property_id': record.id,
+            'property_code': record.property_code,
+            'deleted_at': now,
+        } for record in properties])
+
+    @api.autovacuum
+    def _gc_deletions(self):
+        self.search([('deleted_at', '<', fields.Datetime.now() - SYNDICATION_DELETION_RETENTION)]).unlink()
+
+
+def _absolutize(value, base_url, key=None):
+    """Prefix the website paths nested in ``value`` with the base URL"""
+    if isinstance(value, dict):
+        return {k: _absolutize(v, base_url, k) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_absolutize(item, base_url) for item in value]
+    if key in SYNDICATION_URL_KEYS and isinstance(value, str) and value.startswith('/'):
+        return base_url + value
+    return value
+
+
+class _JsonLinesWriter:
+    """One JSON object per line, the last line tells the feed is complete"""
+
+    def _line(self, data):
+        return json.dumps(data, default=str, separators=(',', ':')) + '\n'
+
+    def start(self, mode, since, until):
+        return self._line({'type': 'feed', 'mode': mode, 'since': since, 'watermark': until})
+
+    def listing(self, data):
+        return self._line(dict(data, type='property'))
+
+    def tombstone(self, data):
+        return self._line(dict(data, type='tombstone'))
+
+    def end(self):
+        return self._line({'type': 'end'})
+
+
+class _XmlWriter:
+    """<feed> document with <property> and <tombstone> elements"""
+
+    def _element(self, tag, value):
+        if value is False or value is None:
+            return f'<{tag}/>'
+        if isinstance(value, dict):
+            return f'<{tag}>%s</{tag}>' % ''.join(self._element(k, v) for k, v in value.items())
+        if isinstance(value, list):
+            item_tag = SYNDICATION_XML_ITEMS.get(tag, 'item')
+            return f'<{tag}>%s</{tag}>' % ''.join(self._element(item_tag, item) for item in value)
+        return f'<{tag}>{escape(str(value))}</{tag}>'
+
+    def start(self, mode, since, until):
+        since_attr = f' since={quoteattr(str(since))}' if since else ''
+        return (f'<?xml version="1.0" encoding="UTF-8"?>\n'
+                f'<feed mode="{mode}"{since_attr} watermark={quoteattr(str(until))}>\n')
+
+    def listing(self, data):
+        data = dict(data)
+        return f'<property id="{data.pop("id")}">%s</property>\n' % ''.join(
+            self._element(key, value) for key, value in data.items())
+
+    def tombstone(self, data):
+        return '<tombstone %s/>\n' % ' '.join(
+            f'{key}={quoteattr(str(value or ""))}' for key, value in data.items())
+
+    def end(self):
+        return '</feed>\n'
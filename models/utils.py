@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+"""Parsing helpers shared by the search, saved search and API code"""
+
+
+def to_int(value):
+    """Return ``value`` as an int, None if it is not a number"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def to_float(value):
+    """Return ``value`` as a float, None if it is not a number"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
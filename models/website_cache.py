@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+
+from odoo import models, api, tools
+
+# Per-worker hit/miss counters for the website snapshot caches
+CACHE_STATS = Counter()
+
+# Property states shown on the public website
+WEBSITE_STATES = ('available', 'draft')
+
+# Cache-Control of the public pages per policy, each one can be overridden
+# with the "ghana_real_estate.cache_control.<policy>" system parameter
+CACHE_CONTROL_POLICIES = {
+    'home': 'public, max-age=60, s-maxage=300',
+    'listing': 'public, max-age=60, s-maxage=300',
+    'property': 'public, max-age=120, s-maxage=600',
+    'agent': 'public, max-age=120, s-maxage=600',
+}
+# Policies whose pages show a single record and its own data. Other pages
+# also change when records join or leave their lists, which no write date
+# reflects, so they only send an ETag and never answer If-Modified-Since.
+LAST_MODIFIED_POLICIES = {'property'}
+
+# Pages rendered for logged in users must never be stored by shared caches
+PRIVATE_CACHE_CONTROL = 'private, no-cache'
+
+# Data version counters as Postgres sequences: cache keys include the
+# current value and writes advance it, instead of clearing the ormcache
+DATA_VERSION_SEQUENCES = {
+    'website': 'ghana_real_estate_website_version_seq',
+    'listing': 'ghana_real_estate_listing_version_seq',
+}
+
+# Memory cap of the rendered card fragments kept by each worker
+FRAGMENT_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+
+class FragmentCache:
+    """Thread-safe LRU of rendered HTML fragments, bounded by their total size"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, html):
+        size = len(html.encode())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous[1]
+            self._entries[key] = (html, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _key, (_html, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+                CACHE_STATS['fragment_evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+FRAGMENT_CACHE = FragmentCache(FRAGMENT_CACHE_MAX_BYTES)
+
+
+class GhanaRealEstateWebsiteCache(models.AbstractModel):
+    """Cached snapshots of the data behind the public website pages"""
+
+    _name = 'ghana_real_estate.website.cache'
+    _description = 'Website Data Cache'
+
+    def init(self):
+        for sequence in DATA_VERSION_SEQUENCES.values():
+            self.env.cr.execute(f'CREATE SEQUENCE IF NOT EXISTS {sequence}')
+
+    def _get_homepage_snapshot(self, website_id, lang):
+        """Return the homepage snapshot for a website and language.
+
+        The snapshot only holds record ids and counters, the caller browses
+        them in its own environment.
+        """
+        CACHE_STATS['homepage_calls'] += 1
+        return self._build_homepage_snapshot(website_id, lang, self._get_data_version('website'))
+
+    # Snapshots of older versions are never read again and age out of the LRU
+    @tools.ormcache('website_id', 'lang', 'version')
+    def _build_homepage_snapshot(self, website_id, lang, version):
+        CACHE_STATS['homepage_misses'] += 1
+        env = self.sudo().with_context(lang=lang).env
+        Property = env['ghana_real_estate.property']
+        published = [
+            ('website_published', '=', True),
+            ('state', 'in', list(WEBSITE_STATES)),
+        ]
+
+        featured = Property.search(published + [('featured', '=', True)],
+                                   limit=6, order='sequence, create_date desc')
+        spotlight = Property.search(published + [('spotlight', '=', True)],
+                                    limit=3, order='sequence, create_date desc')
+        property_types = env['ghana_real_estate.property.type'].search([
+            ('website_published', '=', True),
+            ('active', '=', True)
+        ], limit=6, order='sequence')
+        locations = env['ghana_real_estate.location'].search([
+            ('active', '=', True)
+        ], limit=10, order='sequence')
+        agents = env['ghana_real_estate.agent'].search([
+            ('website_published', '=', True),
+            ('featured_agent', '=', True),
+            ('active', '=', True)
+        ], limit=4, order='sequence')
+
+        # One grouped query for both sale and rent counters
+        counts = {
+            group['transaction_type']: group['transaction_type_count']
+            for group in Property.read_group(
+                published + [('transaction_type', 'in', ['sale', 'rent'])],
+                ['transaction_type'], ['transaction_type'])
+        }
+
+        return {
+            'featured_property_ids': tuple(featured.ids),
+            'spotlight_property_ids': tuple(spotlight.ids),
+            'property_type_ids': tuple(property_types.ids),
+            'location_ids': tuple(locations.ids),
+            'featured_agent_ids': tuple(agents.ids),
+            'properties_for_sale': counts.get('sale', 0),
+            'properties_for_rent': counts.get('rent', 0),
+        }
+
+    @api.model
+    def _invalidate_website_caches(self):
+        """Outdate every cached website snapshot, in all workers"""
+        if self.env.context.get('defer_website_cache_invalidation'):
+            return
+        CACHE_STATS['invalidations'] += 1
+        self._bump_data_version('website')
+
+    @api.model
+    def _get_data_version(self, scope):
+        """Current value of a data version counter, see DATA_VERSION_SEQUENCES"""
+        self.env.cr.execute(f'SELECT last_value FROM {DATA_VERSION_SEQUENCES[scope]}')
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def _bump_data_version(self, scope):
+        """Advance a data version counter once the transaction commits.
+
+        Bumping earlier would let a concurrent request cache the data of
+        before the commit under the new version. Several bumps of the same
+        transaction advance the counter once.
+        """
+        cr = self.env.cr
+        pending = cr.postcommit.data.setdefault('ghana_real_estate.data_versions', set())
+        if scope in pending:
+            return
+        if not pending:
+            registry = self.env.registry
+
+            @cr.postcommit.add
+            def bump_versions():
+                with registry.cursor() as bump_cr:
+                    for pending_scope in sorted(pending):
+                        bump_cr.execute("SELECT nextval(%s)", [DATA_VERSION_SEQUENCES[pending_scope]])
+        pending.add(scope)
+
+    @api.model
+    def _get_cache_control(self, policy):
+        """Return the Cache-Control header value of a page policy"""
+        if not self.env.user._is_public():
+            return PRIVATE_CACHE_CONTROL
+        return self.env['ir.config_parameter'].sudo().get_param(
+            f'ghana_real_estate.cache_control.{policy}', CACHE_CONTROL_POLICIES.get(policy, 'no-cache'))
+
+    @tools.ormcache()
+    def _get_views_version(self):
+        """Last change of any view, so that template updates change the ETags"""
+        self.env.cr.execute("SELECT MAX(write_date) FROM ir_ui_view")
+        return str(self.env.cr.fetchone()[0])
+
+    @api.model
+    def _get_page_validators(self, recordsets, extra=()):
+        """Return the (ETag, Last-Modified) of a page rendering ``recordsets``.
+
+        The ETag covers the ids and write dates of the records, the language,
+        the user and the ``extra`` values identifying the page; Last-Modified
+        is the most recent write date among the records.
+        """
+        CACHE_STATS['validator_calls'] += 1
+        digest = hashlib.sha1()
+        for part in (self._get_views_version(), self.env.lang, self.env.uid) + tuple(extra):
+            digest.update(repr(part).encode())
+        last_modified = None
+        for records in recordsets:
+            for record in records.sudo():
+                write_date = record.write_date
+                digest.update(f'{record._name},{record.id},{write_date};'.encode())
+                if write_date and (last_modified is None or write_date > last_modified):
+                    last_modified = write_date
+        return digest.hexdigest(), last_modified
+
+    @api.model
+    def _render_fragment(self, template, record, values, dependencies=()):
+        """Return ``template`` rendered for ``record``.
+
+        Fragments are kept in a per-worker LRU keyed by the record and the
+        write dates of the records in ``dependencies``, the language, the
+        website and the views version, so any change renders a new entry and
+        stale ones are evicted over time.
+        """
+        website = self.env['website'].get_current_website()
+        key = (
+            template,
+            record._name,
+            record.id,
+            str(record.write_date),
+            tuple(str(dependency.write_date) for dependency in dependencies),
+            self.env.lang,
+            website.id,
+            self._get_views_version(),
+        )
+        CACHE_STATS['fragment_calls'] += 1
+        html = FRAGMENT_CACHE.get(key)
+        if html is None:
+            CACHE_STATS['fragment_misses'] += 1
+            html = self.env['ir.qweb']._render(template, values)
+            FRAGMENT_CACHE.set(key, html)
+        return html
+
+    @api.model
+    def get_cache_stats(self):
+        """Return the hit/miss counters of this worker"""
+        calls = CACHE_STATS['homepage_calls']
+        misses = CACHE_STATS['homepage_misses']
+        return {
+            'homepage_hits': calls - misses,
+            'homepage_misses': misses,
+            'homepage_hit_ratio': round((calls - misses) / calls, 4) if calls else 0.0,
+            'invalidations': CACHE_STATS['invalidations'],
+            'not_modified': CACHE_STATS['not_modified'],
+            'validator_calls': CACHE_STATS['validator_calls'],
+            'fragment_hits': CACHE_STATS['fragment_calls'] - CACHE_STATS['fragment_misses'],
+            'fragment_misses': CACHE_STATS['fragment_misses'],
+            'fragment_evictions': CACHE_STATS['fragment_evictions'],
+            'fragment_entries': len(FRAGMENT_CACHE),
+            'fragment_bytes': FRAGMENT_CACHE.size,
+        }
+
+
+class GhanaRealEstateWebsiteCacheMixin(models.AbstractModel):
+    """Invalidate the website caches when a relevant field changes"""
+
+    _name = 'ghana_real_estate.website.cache.mixin'
+    _description = 'Website Cache Invalidation Mixin'
+
+    # Fields whose changes alter the cached website snapshots
+    _website_cache_fields = set()
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['ghana_real_estate.website.cache']._invalidate_website_caches()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        if self._website_cache_fields.intersection(vals):
+            self.env['ghana_real_estate.website.cache']._invalidate_website_caches()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env['ghana_real_estate.website.cache']._invalidate_website_caches()
+        return res
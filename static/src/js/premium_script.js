@@ -30,6 +30,7 @@
             this.initCompareFunctionality();
             this.initFavoriteFunctionality();
             this.initLazyLoading();
+            this.initTypeahead();
         },
 
         /**
@@ -449,6 +450,36 @@
                     $(this).attr('src', $(this).data('src'));
                 });
             }
+        },
+
+        /**
+         * Location/property typeahead backed by /api/suggest
+         */
+        initTypeahead: function() {
+            const $input = $('#location-input');
+            if (!$input.length) {
+                return;
+            }
+
+            const $list = $('<datalist id="location-suggestions"></datalist>');
+            $input.attr('list', 'location-suggestions').after($list);
+
+            $input.on('input', debounce(function() {
+                const term = $input.val().trim();
+                if (term.length < 2) {
+                    $list.empty();
+                    return;
+                }
+                PremiumWebsite.api.suggest(term, 8, function(error, result) {
+                    if (error || !result) {
+                        return;
+                    }
+                    $list.empty();
+                    result.suggestions.forEach(suggestion => {
+                        $list.append($('<option>').attr('value', suggestion.label));
+                    });
+                });
+            }, 200));
         }
     };
 
@@ -581,6 +612,25 @@
             });
         },
 
+        suggest: function(term, limit, callback) {
+            $.ajax({
+                url: '/api/suggest',
+                method: 'POST',
+                data: JSON.stringify({
+                    jsonrpc: '2.0',
+                    method: 'call',
+                    params: { term: term, limit: limit }
+                }),
+                contentType: 'application/json',
+                success: function(response) {
+                    callback(null, response.result);
+                },
+                error: function(xhr, status, error) {
+                    callback(error, null);
+                }
+            });
+        },
+
         getFeaturedProperties: function(limit, callback) {
             $.ajax({
                 url: `/api/featured-properties?limit=${limit}`,
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+from . import test_property_search
+from . import test_property_lifecycle
+from . import test_rate_limit
+from . import test_lead_queue
+from . import test_saved_search
+from . import test_sitemap
+from . import test_syndication
+from . import test_price_report
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+from odoo.tests.common import TransactionCase
+
+
+class GhanaRealEstateCase(TransactionCase):
+    """Catalogue of its own: a location, two property types and an agent"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.location = cls.env['ghana_real_estate.location'].create({
+            'name': 'Test Region',
+            'code': 'test-region',
+        })
+        cls.house = cls.env['ghana_real_estate.property.type'].create({
+            'name': 'Test House',
+            'code': 'test-house',
+        })
+        cls.apartment = cls.env['ghana_real_estate.property.type'].create({
+            'name': 'Test Apartment',
+            'code': 'test-apartment',
+        })
+        cls.agent = cls.env['ghana_real_estate.agent'].create({
+            'name': 'Test Agent',
+            'license_number': 'TEST-LICENSE-1',
+            'phone': '+233 20 000 0000',
+            'email': 'test.agent@example.com',
+        })
+
+    @classmethod
+    def _create_property(cls, **vals):
+        return cls.env['ghana_real_estate.property'].create(dict({
+            'name': 'Test Property',
+            'property_type_id': cls.house.id,
+            'location_id': cls.location.id,
+            'city': 'Test City',
+            'address': '1 Test Street',
+            'price': 100000,
+            'transaction_type': 'sale',
+            'state': 'available',
+            'website_published': True,
+            'agent_id': cls.agent.id,
+        }, **vals))
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import tagged
+
+from .common import GhanaRealEstateCase
+
+
+@tagged('post_install', '-at_install')
+class TestLeadQueue(GhanaRealEstateCase):
+
+    def test_repeated_submissions_join_the_first_lead(self):
+        Queue = self.env['ghana_real_estate.lead.queue']
+        record = self._create_property()
+        post = {'property_id': str(record.id), 'name': 'Kofi', 'email': 'Kofi@Example.com',
+                'message': 'Is it still available?'}
+        first = Queue._enqueue('inquiry', post)
+        repeat = Queue._enqueue('inquiry', dict(post, email='kofi@example.com', message='Any news?'))
+        other = Queue._enqueue('viewing', dict(post, preferred_date='2030-01-15'))
+        self.assertEqual(first.dedupe_key, repeat.dedupe_key)
+        self.assertNotEqual(first.dedupe_key, other.dedupe_key)
+
+        stats = {'created': 0, 'duplicates': 0, 'retried': 0, 'failed': 0}
+        (first | repeat | other)._process_batch(stats)
+        self.assertEqual((stats['created'], stats['duplicates']), (2, 1))
+        self.assertEqual(first.state, 'done')
+        self.assertEqual(repeat.state, 'duplicate')
+        self.assertEqual(repeat.lead_id, first.lead_id)
+        self.assertNotEqual(other.lead_id, first.lead_id)
+        # The repeated message is kept on the lead
+        self.assertIn('Any news?', ' '.join(first.lead_id.message_ids.mapped('body')))
+
+        # A later batch still finds the lead within the dedupe window
+        again = Queue._enqueue('inquiry', post)
+        again._process_batch(stats)
+        self.assertEqual(again.state, 'duplicate')
+        self.assertEqual(again.lead_id, first.lead_id)
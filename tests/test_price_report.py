@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import tagged
+
+from .common import GhanaRealEstateCase
+
+
+@tagged('post_install', '-at_install')
+class TestPriceReport(GhanaRealEstateCase):
+
+    def _age(self, record, created_days_ago, off_market_days_ago=None):
+        self.env.flush_all()
+        self.env.cr.execute("""
+            UPDATE ghana_real_estate_property
+               SET create_date = NOW() - make_interval(days => %s),
+                   off_market_date = CURRENT_DATE - %s::int
+             WHERE id = %s
+        """, [created_days_ago, off_market_days_ago, record.id])
+
+    def _refresh(self):
+        Report = self.env['ghana_real_estate.price.report']
+        self.env.flush_all()
+        self.env.cr.execute(f'REFRESH MATERIALIZED VIEW {Report._table}')
+        Report.invalidate_model()
+        return Report
+
+    def test_days_on_market(self):
+        self._age(self._create_property(price=100000), 10)
+        sold = self._create_property(price=300000)
+        sold.write({'state': 'sold'})
+        self._age(sold, 40, 10)
+        # Not on the market: counted in the prices, not in the days on market
+        self._age(self._create_property(price=200000, state='draft'), 200)
+        expired = self._create_property(price=200000)
+        expired.write({'state': 'expired'})
+        self._age(expired, 100, 1)
+
+        row = self._refresh().search([('location_id', '=', self.location.id)])
+        self.assertEqual(len(row), 1)
+        self.assertEqual(row.property_count, 4)
+        self.assertEqual(row.median_price, 200000)
+        self.assertAlmostEqual(row.avg_days_on_market, 20)
+        self.assertAlmostEqual(row.median_days_on_market, 20)
+
+    def test_ids_are_stable(self):
+        self._create_property(transaction_type='rent', price=2000)
+        Report = self._refresh()
+        row = Report.search([('location_id', '=', self.location.id)])
+        row_id = row.id
+        # A new group sorting before it does not renumber the row
+        self._create_property(property_type_id=self.apartment.id, transaction_type='lease', price=5000)
+        Report = self._refresh()
+        rows = Report.search([('location_id', '=', self.location.id)])
+        self.assertEqual(len(rows), 2)
+        self.assertIn(row_id, rows.ids)
+        self.assertEqual(Report.browse(row_id).transaction_type, 'rent')
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+from odoo import fields
+from odoo.exceptions import UserError
+from odoo.tests import tagged
+
+from .common import GhanaRealEstateCase
+
+
+@tagged('post_install', '-at_install')
+class TestPropertyLifecycle(GhanaRealEstateCase):
+
+    def test_bulk_transition_reports_each_id(self):
+        draft = self._create_property(state='draft')
+        sold = self._create_property(state='sold')
+        missing_id = (draft | sold).sorted('id')[-1].id + 1000
+        summary = self.env['ghana_real_estate.property'].bulk_transition(
+            [draft.id, sold.id, missing_id, draft.id], 'mark_as_rented', chunk_size=1)
+        self.assertEqual(summary['done'], [draft.id])
+        self.assertEqual(summary['skipped'], [{'id': sold.id, 'state': 'sold'}])
+        self.assertEqual(summary['missing'], [missing_id])
+        self.assertEqual(draft.state, 'rented')
+        self.assertEqual(draft.off_market_date, fields.Date.today())
+        self.assertEqual(sold.state, 'sold')
+
+    def test_unknown_transition_is_rejected(self):
+        with self.assertRaises(UserError):
+            self.env['ghana_real_estate.property'].bulk_transition([], 'demolish')
+
+    def test_back_on_market_clears_the_off_market_date(self):
+        record = self._create_property()
+        record.write({'state': 'sold'})
+        self.assertEqual(record.off_market_date, fields.Date.today())
+        record.bulk_transition(record.ids, 'reset_to_available')
+        self.assertFalse(record.off_market_date)
+
+    def test_city_counter_follows_publication(self):
+        city = self.env['ghana_real_estate.city'].create({
+            'name': 'Counter City',
+            'region_id': self.location.id,
+        })
+        self.assertEqual(city.property_count, 0)
+        record = self._create_property(city='Counter City')
+        self.assertEqual(city.property_count, 1)
+        record.bulk_transition(record.ids, 'unpublish')
+        self.assertEqual(city.property_count, 0)
+        record.write({'website_published': True})
+        self.assertEqual(city.property_count, 1)
+        record.write({'city': 'Elsewhere'})
+        self.assertEqual(city.property_count, 0)
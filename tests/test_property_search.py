@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import tagged
+
+from .common import GhanaRealEstateCase
+
+
+@tagged('post_install', '-at_install')
+class TestPropertySearch(GhanaRealEstateCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.engine = cls.env['ghana_real_estate.property.search']
+        # Equal prices make the id tie-breaker matter
+        cls.properties = cls.env['ghana_real_estate.property']
+        for price in (50000, 75000, 75000, 75000, 90000, 120000, 120000):
+            cls.properties |= cls._create_property(price=price)
+        cls.rentals = cls._create_property(property_type_id=cls.apartment.id, transaction_type='rent',
+                                           price=2000, bedrooms=2)
+        cls.domain = cls.engine._build_domain({'location_id': cls.location.id})
+
+    def _collect_pages(self, order, limit):
+        ids, cursor, pages = [], None, 0
+        while True:
+            result = self.engine._search_faceted(self.domain, limit=limit, order=order,
+                                                 with_facets=False, cursor=cursor)
+            ids += result['records'].ids
+            pages += 1
+            cursor = result['next_cursor']
+            if not cursor:
+                return ids, pages
+
+    def test_cursor_pages_follow_the_keyset_order(self):
+        for order in ('price asc', 'price desc', 'create_date desc'):
+            expected = self.env['ghana_real_estate.property'].search(
+                self.domain, order=self.engine._get_keyset_order(order)).ids
+            ids, pages = self._collect_pages(order, limit=2)
+            self.assertEqual(ids, expected, order)
+            self.assertEqual(pages, 4, order)
+
+    def test_cursor_round_trip(self):
+        record = self.properties[0]
+        for order in ('price asc', 'create_date desc'):
+            cursor = self.engine._encode_cursor(order, record)
+            field_name = 'price' if order == 'price asc' else 'create_date'
+            self.assertEqual(self.engine._decode_cursor(cursor, order), (record[field_name], record.id))
+            # A cursor only applies to the order it was issued for
+            self.assertIsNone(self.engine._decode_cursor(cursor, 'price desc'))
+        self.assertIsNone(self.engine._decode_cursor('not-a-cursor', 'price asc'))
+
+    def test_cursor_domain_bounds_the_sort_key(self):
+        self.assertEqual(self.engine._get_cursor_domain('price desc', 75000.0, 42), [
+            ('price', '<=', 75000.0),
+            '|',
+            ('price', '<', 75000.0),
+            '&', ('price', '=', 75000.0), ('id', '<', 42),
+        ])
+
+    def test_name_order_is_paginated_by_offset(self):
+        result = self.engine._search_faceted(self.domain, limit=2, order='name asc',
+                                             with_facets=False, cursor='ignored')
+        self.assertEqual(len(result['records']), 2)
+        self.assertIsNone(result['next_cursor'])
+
+    def test_facets_leave_out_their_own_filter(self):
+        filters = {'location_id': self.location.id, 'property_type_id': self.house.id}
+        domain = self.engine._build_domain(filters)
+        result = self.engine._search_faceted(domain, limit=20, with_facets=True, filters=filters)
+        self.assertEqual(result['total'], len(self.properties))
+        facets = result['facets']
+        # The other type can still be chosen, with its own count
+        self.assertEqual(facets['property_type_id'][self.house.id], len(self.properties))
+        self.assertEqual(facets['property_type_id'][self.apartment.id], 1)
+        # Other dimensions are counted with the type filter applied
+        self.assertEqual(facets['transaction_type'], {'sale': len(self.properties)})
+        self.assertEqual(facets['bedrooms'][2], 0)
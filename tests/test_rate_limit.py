@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+from ..models.rate_limit import MemoryTokenBuckets
+
+# Bucket keys of a throttled form post
+IP = 'test-rate-limit:ip:192.0.2.1'
+SESSION = 'test-rate-limit:session:1'
+
+
+@tagged('post_install', '-at_install')
+class TestRateLimit(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.RateLimit = cls.env['ghana_real_estate.rate.limit']
+        set_param = cls.env['ir.config_parameter'].sudo().set_param
+        set_param('ghana_real_estate.rate_limit_capacity', 2)
+        set_param('ghana_real_estate.rate_limit_refill_per_minute', 2)
+
+    def _use_store(self, store):
+        self.env['ir.config_parameter'].sudo().set_param('ghana_real_estate.rate_limit_store', store)
+
+    def _assert_all_or_nothing(self, consume):
+        self.assertTrue(consume([IP]))
+        self.assertTrue(consume([IP]))
+        # The empty IP bucket denies the request and leaves the session one full
+        self.assertFalse(consume([IP, SESSION]))
+        self.assertFalse(consume([IP, SESSION]))
+        self.assertTrue(consume([SESSION]))
+        self.assertTrue(consume([SESSION]))
+        self.assertFalse(consume([SESSION]))
+
+    def test_memory_buckets(self):
+        buckets = MemoryTokenBuckets(100)
+        self._assert_all_or_nothing(lambda keys: buckets.consume(keys, 2, 0.0))
+        # A minute at two tokens per minute refills the bucket
+        tokens, updated = buckets._buckets[IP]
+        buckets._buckets[IP] = (tokens, updated - 60)
+        self.assertTrue(buckets.consume([IP], 2, 2 / 60))
+        self.assertTrue(buckets.consume([IP], 2, 2 / 60))
+        self.assertFalse(buckets.consume([IP], 2, 2 / 60))
+
+    def test_database_buckets(self):
+        self._use_store('database')
+        self.env['ir.config_parameter'].sudo().set_param('ghana_real_estate.rate_limit_refill_per_minute', 0)
+        self._assert_all_or_nothing(self.RateLimit._consume)
+        self.env.cr.execute("SELECT tokens FROM ghana_real_estate_rate_limit WHERE key = %s", [IP])
+        self.assertEqual(self.env.cr.fetchone()[0], 0, 'Denied requests never take a token')
+
+        self.env['ir.config_parameter'].sudo().set_param('ghana_real_estate.rate_limit_refill_per_minute', 2)
+        self.env.cr.execute("""
+            UPDATE ghana_real_estate_rate_limit SET updated_at = updated_at - 60 WHERE key = %s
+        """, [IP])
+        self.assertTrue(self.RateLimit._consume([IP]))
+        self.assertTrue(self.RateLimit._consume([IP]))
+        self.assertFalse(self.RateLimit._consume([IP]))
+
+    def test_duplicate_submission(self):
+        post = {'name': 'Ama', 'email': 'ama@example.com', 'csrf_token': 'one'}
+        self.assertFalse(self.RateLimit._is_duplicate_submission('/test/form', post))
+        self.assertTrue(self.RateLimit._is_duplicate_submission('/test/form', dict(post, csrf_token='two')))
+        self.assertFalse(self.RateLimit._is_duplicate_submission('/test/other', post))
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import tagged
+
+from .common import GhanaRealEstateCase
+
+
+@tagged('post_install', '-at_install')
+class TestSavedSearch(GhanaRealEstateCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.SavedSearch = cls.env['ghana_real_estate.saved.search']
+
+    def _create_search(self, filters):
+        return self.SavedSearch.create({'name': 'Test Search', 'filters': filters})
+
+    def test_compile_filters(self):
+        compiled = self.SavedSearch._compile_filters({
+            'property_type': self.house.code,
+            'location_id': str(self.location.id),
+            'price_range': '100000-500000',
+            'min_price': '150000',
+            'bedrooms': '3',
+            'transaction_type': 'sale',
+        })
+        self.assertEqual(compiled['property_type_id'], self.house.id)
+        self.assertEqual(compiled['location_id'], self.location.id)
+        # Explicit bounds win over the band
+        self.assertEqual((compiled['min_price'], compiled['max_price']), (150000, 500000))
+        self.assertEqual(compiled['min_bedrooms'], 3)
+        self.assertEqual(compiled['transaction_type'], 'sale')
+        self.assertFalse(compiled['needs_verification'])
+
+        residual = self.SavedSearch._compile_filters({'property_type': 'no-such-type', 'location': 'Osu'})
+        self.assertFalse(residual['property_type_id'])
+        self.assertTrue(residual['needs_verification'])
+
+    def test_filters_are_normalized(self):
+        search = self._create_search({'bedrooms': 2, 'max_price': '', 'sort': 'price asc',
+                                      'property_type': 'any'})
+        self.assertEqual(search.filters, '{"bedrooms": "2"}')
+        self.assertEqual(search.min_bedrooms, 2)
+
+    def test_match_properties(self):
+        typed = self._create_search({'property_type_id': self.house.id, 'location_id': self.location.id,
+                                     'max_price': 200000, 'transaction_type': 'sale'})
+        anywhere = self._create_search({'bedrooms': 3})
+        by_city = self._create_search({'location': 'Osu', 'property_type_id': self.apartment.id})
+
+        cheap_house = self._create_property(price=150000, bedrooms=2)
+        big_house = self._create_property(price=400000, bedrooms=4)
+        osu_flat = self._create_property(property_type_id=self.apartment.id, city='Osu', bedrooms=3)
+        other_flat = self._create_property(property_type_id=self.apartment.id, city='Tema')
+        rental = self._create_property(price=150000, transaction_type='rent')
+        properties = cheap_house | big_house | osu_flat | other_flat | rental
+
+        created = self.SavedSearch._match_properties(properties.ids)
+        matches = {(match.search_id, match.property_id) for match in
+                   self.env['ghana_real_estate.saved.search.match'].search([
+                       ('search_id', 'in', (typed | anywhere | by_city).ids)])}
+        self.assertEqual(matches, {
+            (typed, cheap_house),
+            (anywhere, big_house),
+            (anywhere, osu_flat),
+            (by_city, osu_flat),
+        })
+        self.assertEqual(created, len(matches))
+        # Matching the same changes again records nothing new
+        self.assertEqual(self.SavedSearch._match_properties(properties.ids), 0)
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+import gzip
+
+from odoo.tests import tagged
+
+from ..models.sitemap import SITEMAP_MAX_URLS
+from .common import GhanaRealEstateCase
+
+
+@tagged('post_install', '-at_install')
+class TestSitemap(GhanaRealEstateCase):
+
+    def test_shards_cover_fixed_id_ranges(self):
+        Shard = self.env['ghana_real_estate.sitemap.shard']
+        published = self._create_property() | self._create_property()
+        hidden = self._create_property(website_published=False)
+        self.env.flush_all()
+
+        shards = Shard._get_shard_signatures('property')
+        for shard in shards:
+            self.assertEqual(shard['first_id'] // SITEMAP_MAX_URLS, shard['sequence'])
+            self.assertEqual(shard['last_id'] // SITEMAP_MAX_URLS, shard['sequence'])
+            self.assertLessEqual(shard['url_count'], SITEMAP_MAX_URLS)
+
+        sequence = published[0].id // SITEMAP_MAX_URLS
+        shard = next(shard for shard in shards if shard['sequence'] == sequence)
+        content = gzip.decompress(Shard._write_shard(
+            'property', shard['first_id'], shard['last_id'], 'https://example.com')).decode()
+        for record in published:
+            self.assertIn(f'<loc>https://example.com/property/{record.id}</loc>', content)
+        self.assertNotIn(f'/property/{hidden.id}<', content)
+
+        # Publishing a record changes the signature of its own shard only
+        before = {vals['sequence']: vals['signature'] for vals in shards}
+        hidden.write({'website_published': True})
+        self.env.flush_all()
+        after = {vals['sequence']: vals['signature'] for vals in Shard._get_shard_signatures('property')}
+        hidden_sequence = hidden.id // SITEMAP_MAX_URLS
+        self.assertNotEqual(after[hidden_sequence], before.get(hidden_sequence))
+        self.assertEqual({key: value for key, value in after.items() if key != hidden_sequence},
+                         {key: value for key, value in before.items() if key != hidden_sequence})
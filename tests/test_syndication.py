@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests import tagged
+
+from .common import GhanaRealEstateCase
+
+
+@tagged('post_install', '-at_install')
+class TestSyndication(GhanaRealEstateCase):
+
+    def test_tombstones(self):
+        Partner = self.env['ghana_real_estate.syndication.partner']
+        listed = self._create_property()
+        unpublished = self._create_property()
+        sold = self._create_property()
+        archived = self._create_property()
+        deleted = self._create_property()
+        unpublished.write({'website_published': False})
+        sold.write({'state': 'sold'})
+        archived.write({'active': False})
+        deleted_id, deleted_code = deleted.id, deleted.property_code
+        deleted.unlink()
+        self.env.flush_all()
+
+        since = fields.Datetime.now() - timedelta(hours=1)
+        until = fields.Datetime.now() + timedelta(hours=1)
+        window = [('write_date', '<=', until), ('write_date', '>', since)]
+        tombstones = {
+            tombstone['id']: tombstone
+            for chunk in Partner._iter_tombstones(self.env, window, until, since)
+            for tombstone in chunk
+        }
+        self.assertNotIn(listed.id, tombstones)
+        self.assertEqual(tombstones[unpublished.id]['reason'], 'unpublished')
+        self.assertEqual(tombstones[sold.id]['reason'], 'sold')
+        self.assertEqual(tombstones[archived.id]['reason'], 'archived')
+        self.assertEqual(tombstones[deleted_id]['reason'], 'deleted')
+        self.assertEqual(tombstones[deleted_id]['property_code'], deleted_code)